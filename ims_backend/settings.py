@@ -277,6 +277,10 @@ SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
 X_FRAME_OPTIONS = 'DENY'
 
+# Inventory stats: serve ProductStatsView from the mv_product_stats materialized view
+# (PostgreSQL only; refresh periodically with `python manage.py refresh_product_stats`)
+INVENTORY_STATS_MATERIALIZED_VIEW = config('INVENTORY_STATS_MATERIALIZED_VIEW', default=False, cast=bool)
+
 # OCR Configuration
 TESSERACT_CMD = config('TESSERACT_CMD', default='tesseract')
 
@@ -0,0 +1,90 @@
+"""
+Per-owner caching helpers for inventory API responses.
+
+Cache keys embed a version number stored per owner. Invalidating bumps that
+version, which orphans every cached entry of the owner at once without needing
+pattern deletes.
+
+The version lives in the cache itself, so a bump is only seen by processes that
+share it. With a process-local backend (the LocMem fallback used when REDIS_URL
+is unset) every gunicorn worker would keep serving its own stale copies, so
+owner_cached() bypasses the cache there and computes each response directly.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Backends whose entries are private to one process
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+PRODUCT_LIST_CACHE_TIMEOUT = 300  # seconds
+PRODUCT_STATS_CACHE_TIMEOUT = 60  # seconds; expiry counts depend on the current date
+BARCODE_LOOKUP_CACHE_TIMEOUT = 30  # seconds; scanners repeat lookups in quick succession
+BARCODE_IMAGE_CACHE_TIMEOUT = 24 * 60 * 60  # seconds; images never go stale, see barcode_image_cache_key()
+PRODUCT_TICKET_CACHE_TIMEOUT = 60 * 60  # seconds; labels are reprinted in batches
+
+
+def _version_key(owner_id) -> str:
+    return f"inventory_cache_version:{owner_id}"
+
+
+def owner_cache_key(prefix: str, owner_id, *parts) -> str:
+    """Build a versioned cache key scoped to the given owner"""
+    version = cache.get(_version_key(owner_id))
+    if version is None:
+        version = 1
+        cache.add(_version_key(owner_id), version, None)
+    digest = hashlib.md5('|'.join(str(part) for part in parts).encode()).hexdigest()
+    return f"{prefix}:{owner_id}:{version}:{digest}"
+
+
+def owner_cache_is_shared() -> bool:
+    """Whether the default cache is shared between processes, so invalidation reaches all of them"""
+    return settings.CACHES['default']['BACKEND'] not in LOCAL_CACHE_BACKENDS
+
+
+def owner_cached(prefix: str, owner_id, parts, compute, timeout):
+    """Cache-aside for a per-owner response; ``compute()`` runs on a miss, or
+    every time when the cache is not shared between processes"""
+    if not owner_cache_is_shared():
+        return compute()
+    key = owner_cache_key(prefix, owner_id, *parts)
+    data = cache.get(key)
+    if data is None:
+        data = compute()
+        cache.set(key, data, timeout)
+    return data
+
+
+def barcode_image_cache_key(code: str, barcode_type: str, format: str) -> str:
+    """Cache key for a rendered barcode image.
+    
+    The image is a pure function of these arguments, so the key is not scoped to
+    an owner: a product whose barcode changes simply looks up a different key.
+    """
+    digest = hashlib.md5(code.encode()).hexdigest()
+    return f"barcode_img:{barcode_type}:{format}:{digest}"
+
+
+def query_params_key(query_params) -> str:
+    """Order-independent representation of request query parameters"""
+    return '&'.join(
+        f"{key}={value}"
+        for key in sorted(query_params)
+        for value in sorted(query_params.getlist(key))
+    )
+
+
+def invalidate_owner_cache(owner_id) -> None:
+    """Drop every cached inventory response of the given owner"""
+    if owner_id is None:
+        return
+    try:
+        cache.incr(_version_key(owner_id))
+    except ValueError:
+        # No version stored yet (or evicted); start a fresh one
+        cache.set(_version_key(owner_id), 2, None)
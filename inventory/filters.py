@@ -1,7 +1,11 @@
+import re
 import django_filters
-from django.db import models
+from django.db import connection, models
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
 from django.utils import timezone
 from datetime import timedelta
+from rest_framework.filters import SearchFilter
 from .models import Product, Category, Supplier
 from supermarkets.models import Supermarket
 
@@ -86,4 +90,45 @@ class ProductFilter(django_filters.FilterSet):
         """Filter out of stock products"""
         if value:
             return queryset.filter(quantity=0)
-        return queryset
\ No newline at end of file
+        return queryset
+
+
+class ProductSearchFilter(SearchFilter):
+    """SearchFilter that uses the search_vector GIN index on PostgreSQL.
+    
+    Every search term is matched as a word prefix against the name, brand,
+    SKU, barcode and description (see migration 0009). Terms containing a
+    digit also match anywhere inside the barcode or SKU, so partial code
+    lookups keep working. Other databases fall back to the regular
+    icontains search over ``search_fields``.
+    """
+    
+    def filter_queryset(self, request, queryset, view):
+        if connection.vendor != 'postgresql':
+            return super().filter_queryset(request, queryset, view)
+        
+        words = re.findall(r'\w+', ' '.join(self.get_search_terms(request)))
+        if not words:
+            return queryset
+        
+        codes = [word for word in words if any(char.isdigit() for char in word)]
+        words = [word for word in words if word not in codes]
+        if words:
+            queryset = queryset.filter(self.matches(queryset, words))
+        for code in codes:
+            queryset = queryset.filter(
+                Q(self.matches(queryset, [code]))
+                | Q(barcode__icontains=code)
+                | Q(sku__icontains=code)
+            )
+        return queryset
+    
+    @staticmethod
+    def matches(queryset, words):
+        """Prefix-match every word against the product's search_vector."""
+        tsquery = ' & '.join(f'{word}:*' for word in words)
+        return RawSQL(
+            f'"{queryset.model._meta.db_table}"."search_vector" @@ to_tsquery(\'simple\', %s)',
+            (tsquery,),
+            output_field=models.BooleanField()
+        )
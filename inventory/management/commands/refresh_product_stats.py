@@ -0,0 +1,28 @@
+"""
+Management command to refresh the product statistics materialized view
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from inventory.services import ProductStatsService
+
+
+class Command(BaseCommand):
+    help = 'Refresh the mv_product_stats materialized view (schedule every few minutes)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--blocking',
+            action='store_true',
+            help='Refresh without CONCURRENTLY (locks out readers, but faster)'
+        )
+    
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            self.stdout.write(
+                self.style.WARNING('Materialized views require PostgreSQL - nothing to refresh')
+            )
+            return
+        
+        ProductStatsService.refresh(concurrently=not options['blocking'])
+        self.stdout.write(self.style.SUCCESS('Product stats refreshed'))
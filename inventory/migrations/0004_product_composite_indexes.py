@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-15 22:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0003_clearance_category_created_by_supplier_created_by_and_more'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='product',
+            name='inventory_p_categor_607069_idx',
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['supermarket', 'is_active'], name='inventory_p_superma_b554aa_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['supermarket', 'expiry_date'], name='inventory_p_superma_eb87f5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['supermarket', 'quantity'], name='inventory_p_superma_0b2dc8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['category', 'is_active'], name='inventory_p_categor_471092_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('quantity__lte', models.F('min_stock_level'))), fields=['supermarket'], name='prod_lowstock_idx'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 4.2.7 on 2026-10-15 22:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+CREATE_PRODUCT_STATS_VIEW = """
+CREATE MATERIALIZED VIEW mv_product_stats AS
+SELECT
+    supermarket_id,
+    COUNT(*) AS total_products,
+    COALESCE(SUM(quantity * price), 0) AS total_value,
+    COUNT(*) FILTER (WHERE quantity <= min_stock_level) AS low_stock_count,
+    COUNT(*) FILTER (WHERE expiry_date < CURRENT_DATE) AS expired_count,
+    COUNT(*) FILTER (WHERE expiry_date > CURRENT_DATE AND expiry_date <= CURRENT_DATE + 7) AS expiring_soon_count,
+    COUNT(*) FILTER (WHERE quantity = 0) AS out_of_stock_count,
+    SUM((selling_price - cost_price) / cost_price * 100)
+        FILTER (WHERE cost_price > 0 AND selling_price > cost_price) AS margin_sum,
+    COUNT(*) FILTER (WHERE cost_price > 0 AND selling_price > cost_price) AS margin_count,
+    NOW() AS refreshed_at
+FROM inventory_product
+WHERE is_active
+GROUP BY supermarket_id;
+CREATE UNIQUE INDEX mv_product_stats_supermarket_idx ON mv_product_stats (supermarket_id);
+"""
+
+DROP_PRODUCT_STATS_VIEW = 'DROP MATERIALIZED VIEW IF EXISTS mv_product_stats;'
+
+
+def create_product_stats_view(apps, schema_editor):
+    # Materialized views are PostgreSQL only; other backends compute stats live
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_PRODUCT_STATS_VIEW)
+
+
+def drop_product_stats_view(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_PRODUCT_STATS_VIEW)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('supermarkets', '0001_initial'),
+        ('inventory', '0004_product_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductStatsSnapshot',
+            fields=[
+                ('supermarket', models.OneToOneField(on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='+', serialize=False, to='supermarkets.supermarket')),
+                ('total_products', models.IntegerField()),
+                ('total_value', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('low_stock_count', models.IntegerField()),
+                ('expired_count', models.IntegerField()),
+                ('expiring_soon_count', models.IntegerField()),
+                ('out_of_stock_count', models.IntegerField()),
+                ('margin_sum', models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True)),
+                ('margin_count', models.IntegerField()),
+                ('refreshed_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'mv_product_stats',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_product_stats_view, drop_product_stats_view),
+    ]
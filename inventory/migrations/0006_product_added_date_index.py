@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-15 22:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_product_stats_materialized_view'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-added_date', 'id'], name='inventory_p_added_d_b8db6f_idx'),
+        ),
+    ]
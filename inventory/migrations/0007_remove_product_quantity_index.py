@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-15 22:45
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0006_product_added_date_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='product',
+            name='inventory_p_quantit_785b60_idx',
+        ),
+    ]
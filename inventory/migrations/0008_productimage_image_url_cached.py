@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-15 22:46
+
+from django.db import migrations, models
+
+
+def fill_image_url_cached(apps, schema_editor):
+    ProductImage = apps.get_model('inventory', 'ProductImage')
+    for product_image in ProductImage.objects.exclude(image='').iterator():
+        product_image.image_url_cached = product_image.image.url
+        product_image.save(update_fields=['image_url_cached'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0007_remove_product_quantity_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productimage',
+            name='image_url_cached',
+            field=models.CharField(blank=True, editable=False, max_length=500),
+        ),
+        migrations.RunPython(fill_image_url_cached, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations
+
+
+ADD_PRODUCT_SEARCH_VECTOR = """
+ALTER TABLE inventory_product ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+    to_tsvector('simple',
+        coalesce(name, '') || ' ' || coalesce(brand, '') || ' ' || coalesce(sku, '') || ' ' ||
+        coalesce(barcode, '') || ' ' || coalesce(description, ''))
+) STORED;
+CREATE INDEX prod_search_gin ON inventory_product USING GIN (search_vector);
+"""
+
+DROP_PRODUCT_SEARCH_VECTOR = """
+DROP INDEX IF EXISTS prod_search_gin;
+ALTER TABLE inventory_product DROP COLUMN IF EXISTS search_vector;
+"""
+
+
+def add_product_search_vector(apps, schema_editor):
+    # Generated tsvector columns are PostgreSQL only; other backends keep ILIKE search
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(ADD_PRODUCT_SEARCH_VECTOR)
+
+
+def drop_product_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_PRODUCT_SEARCH_VECTOR)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0008_productimage_image_url_cached'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_product_search_vector, drop_product_search_vector),
+    ]
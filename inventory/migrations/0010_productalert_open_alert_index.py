@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-15 23:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0009_product_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='productalert',
+            index=models.Index(fields=['product', 'is_resolved', 'alert_type'], name='inventory_p_product_ea7445_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-15 23:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0010_productalert_open_alert_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='product',
+            name='inventory_p_superma_b554aa_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='inventory_p_superma_eb87f5_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='inventory_p_superma_0b2dc8_idx',
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['supermarket', 'is_active', 'expiry_date'], name='inventory_p_superma_3e7459_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['supermarket', 'is_active', 'quantity'], name='inventory_p_superma_eb5551_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['supermarket', 'is_active', 'added_date'], name='inventory_p_superma_680d7a_idx'),
+        ),
+    ]
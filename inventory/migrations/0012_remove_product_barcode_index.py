@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-15 23:09
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0011_product_active_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='product',
+            name='inventory_p_barcode_3a77e5_idx',
+        ),
+    ]
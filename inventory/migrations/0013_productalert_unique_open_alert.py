@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-15 23:10
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def resolve_duplicate_open_alerts(apps, schema_editor):
+    # Keep the oldest open alert of each product/type, resolve the rest
+    ProductAlert = apps.get_model('inventory', 'ProductAlert')
+    seen = set()
+    duplicate_ids = []
+    open_alerts = ProductAlert.objects.filter(is_resolved=False).order_by('created_at', 'pk')
+    for pk, product_id, alert_type in open_alerts.values_list('pk', 'product_id', 'alert_type').iterator():
+        if (product_id, alert_type) in seen:
+            duplicate_ids.append(pk)
+        else:
+            seen.add((product_id, alert_type))
+    for start in range(0, len(duplicate_ids), 500):
+        ProductAlert.objects.filter(pk__in=duplicate_ids[start:start + 500]).update(
+            is_resolved=True, resolved_at=timezone.now()
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0012_remove_product_barcode_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(resolve_duplicate_open_alerts, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='productalert',
+            name='inventory_p_product_ea7445_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='productalert',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_resolved', False)), fields=('product', 'alert_type'), name='uq_open_product_alert'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-15 23:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0013_productalert_unique_open_alert'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='productalert',
+            index=models.Index(fields=['product', '-created_at'], name='inventory_p_product_4455a0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stockmovement',
+            index=models.Index(fields=['product', '-created_at'], name='inventory_s_product_cfb4fb_idx'),
+        ),
+    ]
@@ -2,6 +2,7 @@ from django.db import models
 from django.conf import settings
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
+from datetime import timedelta
 from decimal import Decimal
 import uuid
 
@@ -59,6 +60,49 @@ class Supplier(models.Model):
         return self.name
 
 
+class ProductQuerySet(models.QuerySet):
+    """QuerySet helpers for products"""
+    
+    def with_valuation(self):
+        """Annotate the total stock value and profit margin computed in SQL"""
+        return self.annotate(
+            annotated_total_value=models.ExpressionWrapper(
+                models.F('quantity') * models.F('price'),
+                output_field=models.DecimalField(max_digits=14, decimal_places=2)
+            ),
+            annotated_profit_margin=models.Case(
+                models.When(
+                    cost_price__gt=0,
+                    then=(models.F('selling_price') - models.F('cost_price')) * 100.0 / models.F('cost_price')
+                ),
+                default=models.Value(0),
+                output_field=models.FloatField()
+            ),
+        )
+    
+    def with_stock_status(self, today=None):
+        """Annotate the stock/expiry flags on top of with_valuation()"""
+        today = today or timezone.now().date()
+        return self.with_valuation().annotate(
+            annotated_is_low_stock=models.ExpressionWrapper(
+                models.Q(quantity__lte=models.F('min_stock_level')),
+                output_field=models.BooleanField()
+            ),
+            annotated_is_expired=models.ExpressionWrapper(
+                models.Q(expiry_date__lt=today),
+                output_field=models.BooleanField()
+            ),
+            annotated_is_expiring_soon=models.ExpressionWrapper(
+                models.Q(expiry_date__gt=today, expiry_date__lte=today + timedelta(days=7)),
+                output_field=models.BooleanField()
+            ),
+            annotated_expiry_delta=models.ExpressionWrapper(
+                models.F('expiry_date') - models.Value(today, output_field=models.DateField()),
+                output_field=models.DurationField()
+            ),
+        )
+
+
 class Product(models.Model):
     """Main product model"""
     
@@ -124,14 +168,27 @@ class Product(models.Model):
     # Status
     is_active = models.BooleanField(default=True)
     
+    objects = ProductQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-added_date']
         indexes = [
-            models.Index(fields=['barcode']),
+            # barcode needs no index here, unique=True already creates one
             models.Index(fields=['name']),
-            models.Index(fields=['category']),
             models.Index(fields=['expiry_date']),
-            models.Index(fields=['quantity']),
+            # Composite indexes for the per-supermarket filters used by lists, alerts and stats;
+            # they all filter on is_active, and the shared prefix serves that filter on its own
+            models.Index(fields=['supermarket', 'is_active', 'expiry_date']),
+            models.Index(fields=['supermarket', 'is_active', 'quantity']),
+            models.Index(fields=['supermarket', 'is_active', 'added_date']),
+            models.Index(fields=['category', 'is_active']),
+            # Keyset pagination of the product list, see ProductCursorPagination
+            models.Index(fields=['-added_date', 'id']),
+            models.Index(
+                fields=['supermarket'],
+                condition=models.Q(quantity__lte=models.F('min_stock_level')),
+                name='prod_lowstock_idx'
+            ),
         ]
     
     def __str__(self):
@@ -139,37 +196,80 @@ class Product(models.Model):
     
     @property
     def is_low_stock(self):
+        # Prefer the SQL values from Product.objects.with_stock_status()
+        if hasattr(self, 'annotated_is_low_stock'):
+            return self.annotated_is_low_stock
         return self.quantity <= self.min_stock_level
     
     @property
     def is_expired(self):
+        if hasattr(self, 'annotated_is_expired'):
+            return self.annotated_is_expired
         return self.expiry_date < timezone.now().date()
     
     @property
     def days_until_expiry(self):
+        if hasattr(self, 'annotated_expiry_delta'):
+            return self.annotated_expiry_delta.days
         delta = self.expiry_date - timezone.now().date()
         return delta.days
     
     @property
     def is_expiring_soon(self):
+        if hasattr(self, 'annotated_is_expiring_soon'):
+            return self.annotated_is_expiring_soon
         return 0 < self.days_until_expiry <= 7
     
     @property
     def profit_margin(self):
+        # Prefer the SQL value from Product.objects.with_valuation()
+        if hasattr(self, 'annotated_profit_margin'):
+            return self.annotated_profit_margin
         if self.cost_price > 0:
             return ((self.selling_price - self.cost_price) / self.cost_price) * 100
         return 0
     
     @property
     def total_value(self):
+        if hasattr(self, 'annotated_total_value'):
+            return self.annotated_total_value
         return self.quantity * self.price
 
 
+class ProductStatsSnapshot(models.Model):
+    """Per-supermarket product statistics backed by the mv_product_stats
+    materialized view (PostgreSQL only, see migration 0005).
+    """
+    
+    supermarket = models.OneToOneField(
+        'supermarkets.Supermarket', on_delete=models.DO_NOTHING,
+        primary_key=True, related_name='+'
+    )
+    total_products = models.IntegerField()
+    total_value = models.DecimalField(max_digits=15, decimal_places=2)
+    low_stock_count = models.IntegerField()
+    expired_count = models.IntegerField()
+    expiring_soon_count = models.IntegerField()
+    out_of_stock_count = models.IntegerField()
+    margin_sum = models.DecimalField(max_digits=20, decimal_places=4, blank=True, null=True)
+    margin_count = models.IntegerField()
+    refreshed_at = models.DateTimeField()
+    
+    class Meta:
+        managed = False
+        db_table = 'mv_product_stats'
+    
+    def __str__(self):
+        return f"Stats for {self.supermarket_id}"
+
+
 class ProductImage(models.Model):
     """Additional product images"""
     
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(upload_to='products/additional/')
+    # Storage URL of image, kept in sync by inventory.signals
+    image_url_cached = models.CharField(max_length=500, blank=True, editable=False)
     alt_text = models.CharField(max_length=255, blank=True, null=True)
     is_primary = models.BooleanField(default=False)
     uploaded_at = models.DateTimeField(auto_now_add=True)
@@ -208,6 +308,10 @@ class StockMovement(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of a product's movements, see MovementCursorPagination
+            models.Index(fields=['product', '-created_at']),
+        ]
     
     def __str__(self):
         return f"{self.product.name} - {self.movement_type} - {self.quantity}"
@@ -243,6 +347,19 @@ class ProductAlert(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of a product's alerts, see AlertCursorPagination
+            models.Index(fields=['product', '-created_at']),
+        ]
+        constraints = [
+            # At most one open alert per product and type; check_and_create_alerts
+            # relies on it to skip duplicates with bulk_create(ignore_conflicts=True)
+            models.UniqueConstraint(
+                fields=['product', 'alert_type'],
+                condition=models.Q(is_resolved=False),
+                name='uq_open_product_alert'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.product.name} - {self.alert_type}"
@@ -289,6 +406,14 @@ class ProductReview(models.Model):
         return f"{self.product.name} - {self.rating}/5 by {self.user.email}"
 
 
+class ClearanceQuerySet(models.QuerySet):
+    """QuerySet helpers for clearance deals"""
+    
+    def active(self):
+        """Deals that are live right now; the SQL form of Clearance.is_active"""
+        return self.filter(expires_at__gt=timezone.now(), product__is_active=True)
+
+
 class Clearance(models.Model):
     """Clearance deals for products without duplicating products.
     - Generates its own SKU and barcode for tickets
@@ -323,6 +448,8 @@ class Clearance(models.Model):
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = ClearanceQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
 
@@ -1,12 +1,38 @@
+import copy
+
+from django.db import IntegrityError, transaction
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.files.storage import default_storage
+from django.utils import timezone
 from rest_framework import serializers
 from .models import (
     Category, Supplier, Product, ProductImage, StockMovement, 
     ProductAlert, Barcode, ProductReview, Clearance, ClearanceBundleItem
 )
 from .services import BarcodeService
+from .cache import invalidate_owner_cache
+
+
+class CachedFieldsMixin:
+    """Build a ModelSerializer's fields once per class instead of per instance.
+    
+    ModelSerializer.get_fields() introspects the model every time a serializer
+    is instantiated, although the result only depends on the class. Keep an
+    unbound copy and give each instance a deep copy of it, as DRF does for
+    declared fields.
+    """
+    
+    def get_fields(self):
+        cls = type(self)
+        fields = cls.__dict__.get('_cached_fields')
+        if fields is None:
+            fields = super().get_fields()
+            cls._cached_fields = copy.deepcopy(fields)
+            return fields
+        return copy.deepcopy(fields)
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for Category model"""
     
     full_name = serializers.ReadOnlyField()
@@ -23,13 +49,18 @@ class CategorySerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at', 'updated_at']
     
     def get_subcategories_count(self, obj):
-        return obj.subcategories.filter(is_active=True).count()
+        # Annotated by the category views; count directly otherwise (e.g. after create)
+        if getattr(obj, 'subcategories_count', None) is None:
+            obj.subcategories_count = obj.subcategories.filter(is_active=True).count()
+        return obj.subcategories_count
     
     def get_products_count(self, obj):
-        return obj.product_set.filter(is_active=True).count()
+        if getattr(obj, 'products_count', None) is None:
+            obj.products_count = obj.product_set.filter(is_active=True).count()
+        return obj.products_count
 
 
-class SupplierSerializer(serializers.ModelSerializer):
+class SupplierSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for Supplier model"""
     
     products_count = serializers.SerializerMethodField()
@@ -44,19 +75,43 @@ class SupplierSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at', 'updated_at']
     
     def get_products_count(self, obj):
-        return obj.product_set.filter(is_active=True).count()
+        # Annotated by the supplier views; count directly otherwise (e.g. after create)
+        if getattr(obj, 'products_count', None) is None:
+            obj.products_count = obj.product_set.filter(is_active=True).count()
+        return obj.products_count
 
 
-class ProductImageSerializer(serializers.ModelSerializer):
+class AbsoluteURLField(serializers.ReadOnlyField):
+    """Render a stored URL as absolute when the request is in the context"""
+    
+    def to_representation(self, value):
+        if not value:
+            return None
+        request = self.context.get('request')
+        if request is not None:
+            return request.build_absolute_uri(value)
+        return value
+
+
+class StoredFileURLField(AbsoluteURLField):
+    """Render a stored file name the way ImageField renders a FieldFile"""
+    
+    def to_representation(self, value):
+        return super().to_representation(default_storage.url(value) if value else value)
+
+
+class ProductImageSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for ProductImage model"""
     
+    image = AbsoluteURLField(source='image_url_cached')
+    
     class Meta:
         model = ProductImage
         fields = ['id', 'image', 'alt_text', 'is_primary', 'uploaded_at']
         read_only_fields = ['uploaded_at']
 
 
-class BarcodeSerializer(serializers.ModelSerializer):
+class BarcodeSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for Barcode model"""
     
     class Meta:
@@ -65,19 +120,25 @@ class BarcodeSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at']
 
 
-class ProductListSerializer(serializers.ModelSerializer):
-    """Lightweight serializer for product lists"""
+class ProductListSerializer(CachedFieldsMixin, serializers.ModelSerializer):
+    """Lightweight serializer for product lists.
+    
+    Expects products annotated by ``Product.objects.with_stock_status()``.
+    """
     
     category_name = serializers.CharField(source='category.name', read_only=True)
     supplier_name = serializers.CharField(source='supplier.name', read_only=True)
     supermarket_name = serializers.CharField(source='supermarket.name', read_only=True)
     supermarket_parent = serializers.UUIDField(source='supermarket.parent.id', read_only=True, allow_null=True)
     supermarket_parent_name = serializers.CharField(source='supermarket.parent.name', read_only=True)
-    is_low_stock = serializers.ReadOnlyField()
-    is_expired = serializers.ReadOnlyField()
-    is_expiring_soon = serializers.ReadOnlyField()
-    days_until_expiry = serializers.ReadOnlyField()
-    total_value = serializers.ReadOnlyField()
+    is_low_stock = serializers.BooleanField(source='annotated_is_low_stock', read_only=True)
+    is_expired = serializers.BooleanField(source='annotated_is_expired', read_only=True)
+    is_expiring_soon = serializers.BooleanField(source='annotated_is_expiring_soon', read_only=True)
+    days_until_expiry = serializers.IntegerField(source='annotated_expiry_delta.days', read_only=True)
+    total_value = serializers.DecimalField(
+        source='annotated_total_value', max_digits=14, decimal_places=2,
+        coerce_to_string=False, read_only=True
+    )
     
     class Meta:
         model = Product
@@ -91,7 +152,51 @@ class ProductListSerializer(serializers.ModelSerializer):
         ]
 
 
-class ProductDetailSerializer(serializers.ModelSerializer):
+class ProductListLightSerializer(serializers.Serializer):
+    """Read-only serializer for product list rows fetched with ``values()``.
+
+    Produces the same payload as ProductListSerializer without building
+    Product instances; see ProductListCreateView.list_values.
+    """
+    
+    id = serializers.UUIDField(read_only=True)
+    name = serializers.CharField(read_only=True)
+    barcode = serializers.CharField(read_only=True)
+    category_name = serializers.CharField(read_only=True)
+    supplier_name = serializers.CharField(read_only=True)
+    quantity = serializers.IntegerField(read_only=True)
+    min_stock_level = serializers.IntegerField(read_only=True)
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+    selling_price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+    expiry_date = serializers.DateField(read_only=True)
+    location = serializers.CharField(read_only=True)
+    is_low_stock = serializers.BooleanField(read_only=True)
+    is_expired = serializers.BooleanField(read_only=True)
+    is_expiring_soon = serializers.BooleanField(read_only=True)
+    days_until_expiry = serializers.IntegerField(source='expiry_delta.days', read_only=True)
+    total_value = serializers.DecimalField(
+        max_digits=14, decimal_places=2, coerce_to_string=False, read_only=True
+    )
+    image = StoredFileURLField()
+    is_active = serializers.BooleanField(read_only=True)
+    added_date = serializers.DateTimeField(read_only=True)
+    supermarket = serializers.UUIDField(read_only=True)
+    supermarket_name = serializers.CharField(read_only=True)
+    supermarket_parent = serializers.UUIDField(read_only=True)
+    supermarket_parent_name = serializers.CharField(read_only=True)
+    
+    # ProductListSerializer skips these keys when the relation is unset
+    relation_name_fields = ('category_name', 'supplier_name', 'supermarket_parent_name')
+    
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        for field_name in self.relation_name_fields:
+            if data[field_name] is None:
+                del data[field_name]
+        return data
+
+
+class ProductDetailSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Detailed serializer for Product model"""
     
     category_name = serializers.CharField(source='category.name', read_only=True)
@@ -101,9 +206,9 @@ class ProductDetailSerializer(serializers.ModelSerializer):
     
     # Computed fields
     is_low_stock = serializers.ReadOnlyField()
-    is_expired = serializers.ReadOnlyField()
-    is_expiring_soon = serializers.ReadOnlyField()
-    days_until_expiry = serializers.ReadOnlyField()
+    is_expired = serializers.SerializerMethodField()
+    is_expiring_soon = serializers.SerializerMethodField()
+    days_until_expiry = serializers.SerializerMethodField()
     profit_margin = serializers.ReadOnlyField()
     total_value = serializers.ReadOnlyField()
     
@@ -128,12 +233,64 @@ class ProductDetailSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['added_date', 'updated_date', 'created_by']
     
+    def _today(self):
+        """Today's date, resolved once per serializer context (views may pass 'today')"""
+        if 'today' not in self.context:
+            self.context['today'] = timezone.now().date()
+        return self.context['today']
+    
+    def get_days_until_expiry(self, obj):
+        return (obj.expiry_date - self._today()).days
+    
+    def get_is_expired(self, obj):
+        return obj.expiry_date < self._today()
+    
+    def get_is_expiring_soon(self, obj):
+        return 0 < self.get_days_until_expiry(obj) <= 7
+    
     def create(self, validated_data):
         validated_data['created_by'] = self.context['request'].user
         return super().create(validated_data)
 
 
-class ProductCreateUpdateSerializer(serializers.ModelSerializer):
+class ProductBulkCreateListSerializer(serializers.ListSerializer):
+    """Create a list of products with batched inserts"""
+    
+    def to_internal_value(self, data):
+        """Validate the items, then check their barcodes against each other and the
+        database so that conflicts are reported per item like field errors.
+        
+        A code taken concurrently after this check, on Product.barcode or on
+        Barcode.code, still fails the insert; _save_with_unique_barcode() then
+        reports it as a single ``{'barcode': [...]}`` error without an item index.
+        """
+        validated_data = super().to_internal_value(data)
+        
+        codes = [item.get('barcode') for item in validated_data]
+        supplied = [code for code in codes if code]
+        taken = set(Product.objects.filter(barcode__in=supplied).values_list('barcode', flat=True))
+        taken.update(Barcode.objects.filter(code__in=supplied).values_list('code', flat=True))
+        
+        errors = []
+        seen = set()
+        for code in codes:
+            if code in taken:
+                errors.append({'barcode': ["Product with this barcode already exists."]})
+            elif code and code in seen:
+                errors.append({'barcode': ["This barcode is repeated in the request."]})
+            else:
+                errors.append({})
+            seen.add(code)
+        
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return validated_data
+    
+    def create(self, validated_data):
+        return self.child.create_many(validated_data)
+
+
+class ProductCreateUpdateSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for creating/updating products"""
     
     class Meta:
@@ -147,19 +304,23 @@ class ProductCreateUpdateSerializer(serializers.ModelSerializer):
             'image_url', 'image', 'supermarket'
         ]
         extra_kwargs = {
-            'barcode': {'required': False},  # Allow omitting barcode; it will be auto-generated
+            # Allow omitting barcode; it will be auto-generated.
+            # Uniqueness is enforced by the database index, see _save_with_unique_barcode().
+            'barcode': {'required': False, 'validators': []},
         }
+        list_serializer_class = ProductBulkCreateListSerializer
     
     def validate_barcode(self, value):
-        """Validate barcode uniqueness"""
-        if not value:
+        """Reject a code already held by a Barcode row; Product.barcode itself is
+        left to the unique index, see _save_with_unique_barcode()"""
+        if not value or isinstance(self.parent, ProductBulkCreateListSerializer):
+            # Batches check all of their codes at once
             return value
-        if self.instance:
-            if Product.objects.exclude(id=self.instance.id).filter(barcode=value).exists():
-                raise serializers.ValidationError("Product with this barcode already exists.")
-        else:
-            if Product.objects.filter(barcode=value).exists():
-                raise serializers.ValidationError("Product with this barcode already exists.")
+        barcodes = Barcode.objects.filter(code=value)
+        if self.instance is not None:
+            barcodes = barcodes.exclude(product=self.instance)
+        if barcodes.exists():
+            raise serializers.ValidationError("Product with this barcode already exists.")
         return value
     
     def validate(self, attrs):
@@ -180,12 +341,71 @@ class ProductCreateUpdateSerializer(serializers.ModelSerializer):
         if 'request' in self.context:
             validated_data['created_by'] = self.context['request'].user
         
-        product = super().create(validated_data)
-        BarcodeService.create_product_barcode(product)
-        return product
-
-
-class StockMovementSerializer(serializers.ModelSerializer):
+        create = super().create
+        
+        def save():
+            # One transaction, so a rejected primary barcode does not leave the product behind
+            product = create(validated_data)
+            BarcodeService.create_product_barcode(product)
+            return product
+        
+        return self._save_with_unique_barcode(save)
+    
+    def create_many(self, validated_data_list):
+        """Create several products and their primary barcodes with two bulk inserts"""
+        missing = [data for data in validated_data_list if not data.get('barcode')]
+        for data, code in zip(missing, BarcodeService.generate_barcode_numbers(len(missing))):
+            data['barcode'] = code
+        
+        created_by = self.context['request'].user if 'request' in self.context else None
+        products = [Product(created_by=created_by, **data) for data in validated_data_list]
+        
+        def save():
+            Product.objects.bulk_create(products)
+            Barcode.objects.bulk_create([
+                Barcode(product=product, code=product.barcode, barcode_type='CODE128', is_primary=True)
+                for product in products
+            ])
+            return products
+        
+        products = self._save_with_unique_barcode(save)
+        # bulk_create() sends no post_save signals
+        for owner_id in {product.supermarket.owner_id for product in products}:
+            invalidate_owner_cache(owner_id)
+        return products
+    
+    def update(self, instance, validated_data):
+        return self._save_with_unique_barcode(super().update, instance, validated_data)
+    
+    def _save_with_unique_barcode(self, save, *args):
+        """Run the write and report a barcode unique violation as a validation error"""
+        try:
+            with transaction.atomic():
+                return save(*args)
+        except IntegrityError as e:
+            if _is_barcode_violation(e):
+                raise serializers.ValidationError({'barcode': ["Product with this barcode already exists."]})
+            raise
+
+
+def _is_barcode_violation(error: IntegrityError) -> bool:
+    """Whether ``error`` is the unique violation on Product.barcode or Barcode.code
+    rather than any other constraint"""
+    diag = getattr(error.__cause__, 'diag', None)
+    for model, column in ((Product, 'barcode'), (Barcode, 'code')):
+        table = model._meta.db_table
+        if diag is not None:
+            # PostgreSQL reports the violated constraint by name, e.g.
+            # inventory_barcode_code_key for Barcode.code
+            if diag.table_name == table and (diag.constraint_name or '').startswith(f"{table}_{column}_"):
+                return True
+        elif f"{table}.{column}" in str(error) and 'NOT NULL' not in str(error):
+            # SQLite/MySQL name the column as "<table>.<column>" in the message
+            return True
+    return False
+
+
+class StockMovementSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for StockMovement model"""
     
     product_name = serializers.CharField(source='product.name', read_only=True)
@@ -201,7 +421,7 @@ class StockMovementSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at', 'created_by']
 
 
-class ProductAlertSerializer(serializers.ModelSerializer):
+class ProductAlertSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for ProductAlert model"""
     
     product_name = serializers.CharField(source='product.name', read_only=True)
@@ -217,7 +437,7 @@ class ProductAlertSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at']
 
 
-class ProductReviewSerializer(serializers.ModelSerializer):
+class ProductReviewSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for ProductReview model"""
     
     user_name = serializers.CharField(source='user.get_full_name', read_only=True)
@@ -257,6 +477,69 @@ class BulkProductUpdateSerializer(serializers.Serializer):
                 raise serializers.ValidationError(f"Field '{field}' is not allowed for bulk update.")
         
         return value
+    
+    def validate(self, attrs):
+        """Validate the updates once for all products.
+        
+        Category/supplier ids are resolved against the requesting user and the
+        other values go through the model field's clean(), as Model.save() is
+        bypassed by the single UPDATE in apply().
+        """
+        updates = dict(attrs['updates'])
+        user = self.context['request'].user
+        for field, model in (('category', Category), ('supplier', Supplier)):
+            if updates.get(field) is None:
+                continue
+            try:
+                updates[field] = model.objects.get(pk=updates[field], created_by=user)
+            except (model.DoesNotExist, ValueError, TypeError):
+                raise serializers.ValidationError({'updates': f"Invalid {field} '{updates[field]}'."})
+        
+        for field, value in updates.items():
+            if field in ('category', 'supplier'):
+                continue
+            try:
+                updates[field] = Product._meta.get_field(field).clean(value, None)
+            except DjangoValidationError as e:
+                raise serializers.ValidationError({'updates': {field: e.messages}})
+        
+        attrs['updates'] = updates
+        return attrs
+    
+    # Products per UPDATE; each chunk commits on its own so a large batch does not
+    # hold all of its row locks at once (and stays under SQLite's parameter limit)
+    UPDATE_CHUNK_SIZE = 500
+    
+    def apply(self, queryset):
+        """Apply the updates to the listed products within ``queryset``, one UPDATE per chunk"""
+        product_ids = self.validated_data['product_ids']
+        updates = self.validated_data['updates']
+        updated_count = 0
+        for start in range(0, len(product_ids), self.UPDATE_CHUNK_SIZE):
+            with transaction.atomic():
+                updated_count += queryset.filter(
+                    id__in=product_ids[start:start + self.UPDATE_CHUNK_SIZE]
+                ).update(**updates)
+        return updated_count
+
+
+class BulkAlertActionSerializer(serializers.Serializer):
+    """Serializer for marking several alerts read/resolved at once"""
+    
+    alert_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False
+    )
+
+
+class BulkBarcodeSearchSerializer(serializers.Serializer):
+    """Serializer for looking up a batch of scanned barcodes"""
+    
+    barcodes = serializers.ListField(
+        child=serializers.CharField(max_length=50),
+        allow_empty=False,
+        max_length=500
+    )
 
 
 class ProductStatsSerializer(serializers.Serializer):
@@ -273,7 +556,7 @@ class ProductStatsSerializer(serializers.Serializer):
     average_profit_margin = serializers.DecimalField(max_digits=5, decimal_places=2)
 
 
-class ClearanceBundleItemSerializer(serializers.ModelSerializer):
+class ClearanceBundleItemSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     product_name = serializers.CharField(source='product.name', read_only=True)
 
     class Meta:
@@ -281,7 +564,7 @@ class ClearanceBundleItemSerializer(serializers.ModelSerializer):
         fields = ['id', 'product', 'product_name', 'quantity']
 
 
-class ClearanceSerializer(serializers.ModelSerializer):
+class ClearanceSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     product_name = serializers.CharField(source='product.name', read_only=True)
     is_active = serializers.ReadOnlyField()
     bundle_items = ClearanceBundleItemSerializer(many=True, required=False)
@@ -1,11 +1,15 @@
 """
 Inventory services for barcode generation, PDF tickets, and other utilities
 """
+import hashlib
 import io
+import logging
 import os
+import secrets
 from datetime import datetime
+from functools import lru_cache
 from decimal import Decimal
-from typing import List, Optional, Dict, Any
+from typing import Iterable, List, Optional, Dict, Any
 
 import barcode
 import qrcode
@@ -16,17 +20,27 @@ from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch, mm
+from reportlab.pdfgen import canvas
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image as RLImage
 from reportlab.platypus.flowables import PageBreak
-from reportlab.graphics.shapes import Drawing, Rect, String
+from reportlab.graphics.shapes import Drawing, Path, Rect, String
 from reportlab.graphics.barcode import code128, qr
+from reportlab.graphics.barcode.widgets import BarcodeCode128
 from reportlab.graphics.barcode.common import Barcode
 from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Sum
+from django.core.cache import cache
 from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
 from django.utils import timezone
 
-from .models import Product, Barcode as BarcodeModel
+from supermarkets.models import Supermarket
+
+from .cache import BARCODE_IMAGE_CACHE_TIMEOUT, barcode_image_cache_key, invalidate_owner_cache
+from .models import Product, ProductStatsSnapshot, Barcode as BarcodeModel
+
+logger = logging.getLogger(__name__)
 
 
 class BarcodeService:
@@ -40,67 +54,32 @@ class BarcodeService:
     
     @staticmethod
     def generate_barcode_number(product_id: str = None) -> str:
-        """Generate a unique barcode number"""
-        import uuid
-        import random
-        
+        """Generate a 12 digit barcode number (13th digit of EAN13 is the check digit)"""
         if product_id:
-            # Use product ID to generate consistent barcode
-            base = str(hash(product_id))[-10:]
+            # Deterministic for a given product, unlike hash() which is salted per process
+            digest = hashlib.blake2b(product_id.encode(), digest_size=6).digest()
+            number = int.from_bytes(digest, 'big') % 10**12
         else:
-            # Generate random barcode
-            base = str(random.randint(1000000000, 9999999999))
-        
-        # Ensure it's 12 digits for EAN13 (13th digit is check digit)
-        barcode_num = base.zfill(12)
-        return barcode_num
+            number = secrets.randbelow(10**12)
+        return f"{number:012d}"
+    
+    @staticmethod
+    def generate_barcode_numbers(n: int) -> list:
+        """Generate ``n`` distinct random barcode numbers in one call"""
+        numbers = set()
+        while len(numbers) < n:
+            numbers.add(f"{secrets.randbelow(10**12):012d}")
+        return list(numbers)
     
     @staticmethod
     def generate_barcode_image(code: str, barcode_type: str = 'CODE128', format: str = 'PNG') -> bytes:
-        """Generate barcode image"""
-        try:
-            barcode_class = BarcodeService.BARCODE_TYPES.get(barcode_type, Code128)
-            
-            # Create barcode with image writer
-            writer = ImageWriter()
-            barcode_instance = barcode_class(code, writer=writer)
-            
-            # Generate image
-            buffer = io.BytesIO()
-            barcode_instance.write(buffer, options={
-                'module_width': 0.2,
-                'module_height': 15.0,
-                'quiet_zone': 6.5,
-                'font_size': 10,
-                'text_distance': 5.0,
-                'background': 'white',
-                'foreground': 'black',
-            })
-            
-            return buffer.getvalue()
-        except Exception as e:
-            raise ValueError(f"Error generating barcode: {str(e)}")
+        """Generate barcode image (memoized, see _cached_barcode_image)"""
+        return _cached_barcode_image(code, barcode_type, format)
     
     @staticmethod
     def generate_qr_code(data: str, size: int = 10) -> bytes:
-        """Generate QR code image"""
-        try:
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_L,
-                box_size=size,
-                border=4,
-            )
-            qr.add_data(data)
-            qr.make(fit=True)
-            
-            img = qr.make_image(fill_color="black", back_color="white")
-            
-            buffer = io.BytesIO()
-            img.save(buffer, format='PNG')
-            return buffer.getvalue()
-        except Exception as e:
-            raise ValueError(f"Error generating QR code: {str(e)}")
+        """Generate QR code image (memoized, see _render_qr_code)"""
+        return _render_qr_code(data, size)
     
     @staticmethod
     def create_product_barcode(product: Product, barcode_type: str = 'CODE128') -> BarcodeModel:
@@ -120,70 +99,185 @@ class BarcodeService:
         )
         
         return barcode_obj
+    
+    @staticmethod
+    def create_product_barcodes(products: List[Product], barcode_type: str = 'CODE128') -> List[BarcodeModel]:
+        """Bulk version of create_product_barcode for freshly created products"""
+        missing = [product for product in products if not product.barcode]
+        if missing:
+            for product, code in zip(missing, BarcodeService.generate_barcode_numbers(len(missing))):
+                product.barcode = code
+            Product.objects.bulk_update(missing, ['barcode'], batch_size=500)
+            # bulk_update() sends no post_save signals
+            owner_ids = Supermarket.objects.filter(
+                pk__in={product.supermarket_id for product in missing}
+            ).values_list('owner_id', flat=True)
+            for owner_id in set(owner_ids):
+                invalidate_owner_cache(owner_id)
+        
+        # Skip products whose primary row already exists, but fail like
+        # create_product_barcode() when a code belongs to another product
+        owners = dict(BarcodeModel.objects.filter(
+            code__in=[product.barcode for product in products]
+        ).values_list('code', 'product_id'))
+        taken = [product.barcode for product in products if owners.get(product.barcode, product.pk) != product.pk]
+        if taken:
+            raise IntegrityError(f"Barcode already assigned to another product: {', '.join(taken)}")
+        
+        return BarcodeModel.objects.bulk_create([
+            BarcodeModel(product=product, code=product.barcode, barcode_type=barcode_type, is_primary=True)
+            for product in products
+            if product.barcode not in owners
+        ], batch_size=500)
+
+
+# Standalone barcode/QR PNGs are tiny and cached; favour encode speed over size
+_PNG_SAVE_OPTIONS = {'optimize': False, 'compress_level': 1}
+
+
+@lru_cache(maxsize=4096)
+def _cached_barcode_image(code: str, barcode_type: str = 'CODE128', format: str = 'PNG') -> bytes:
+    """Barcode image cached in-process, then in the shared cache so that worker
+    processes reuse each other's renders"""
+    key = barcode_image_cache_key(code, barcode_type, format)
+    image = cache.get(key)
+    if image is None:
+        image = _render_barcode_image(code, barcode_type, format)
+        cache.set(key, image, BARCODE_IMAGE_CACHE_TIMEOUT)
+    return image
+
+
+def _render_barcode_image(code: str, barcode_type: str = 'CODE128', format: str = 'PNG') -> bytes:
+    """Render a barcode PNG"""
+    try:
+        barcode_class = BarcodeService.BARCODE_TYPES.get(barcode_type, Code128)
+        
+        # Create barcode with image writer
+        writer = ImageWriter()
+        barcode_instance = barcode_class(code, writer=writer)
+        
+        # Generate image
+        img = barcode_instance.render({
+            'module_width': 0.2,
+            'module_height': 15.0,
+            'quiet_zone': 6.5,
+            'font_size': 10,
+            'text_distance': 5.0,
+            'background': 'white',
+            'foreground': 'black',
+        })
+        
+        buffer = io.BytesIO()
+        img.save(buffer, format=writer.format, **_PNG_SAVE_OPTIONS)
+        return buffer.getvalue()
+    except Exception as e:
+        raise ValueError(f"Error generating barcode: {str(e)}")
+
+
+@lru_cache(maxsize=4096)
+def _render_qr_code(data: str, size: int = 10) -> bytes:
+    """Render a QR code PNG; cached by (data, size)"""
+    try:
+        qr = qrcode.QRCode(
+            version=1,
+            error_correction=qrcode.constants.ERROR_CORRECT_L,
+            box_size=size,
+            border=4,
+        )
+        qr.add_data(data)
+        qr.make(fit=True)
+        
+        img = qr.make_image(fill_color="black", back_color="white")
+        
+        buffer = io.BytesIO()
+        img.save(buffer, format='PNG', **_PNG_SAVE_OPTIONS)
+        return buffer.getvalue()
+    except Exception as e:
+        raise ValueError(f"Error generating QR code: {str(e)}")
+
+
+# Ticket styles are built once at import; ReportLab only reads them while rendering
+_STYLES = getSampleStyleSheet()
+
+_BULK_TITLE_STYLE = ParagraphStyle(
+    'Title',
+    parent=_STYLES['Title'],
+    fontSize=16,
+    spaceAfter=20,
+    alignment=1
+)
+
+
+# Bulk ticket cell; the table draws each line of it as a separate text line.
+# String cells are not parsed as markup, so keep it plain text.
+_TICKET_CELL_TEMPLATE = (
+    "{name}\n"
+    "${price:.2f}\n"
+    "Barcode: {barcode}"
+    "{brand_line}{expiry_line}"
+)
+
+
+@lru_cache(maxsize=4096)
+def _ticket_cell_content(name, price, barcode, brand, expiry_date) -> str:
+    """Bulk ticket cell for the given product fields; cached so reprints skip the formatting"""
+    return _TICKET_CELL_TEMPLATE.format_map({
+        'name': name[:25],
+        'price': price,
+        'barcode': barcode,
+        'brand_line': f"\nBrand: {brand}" if brand else "",
+        'expiry_line': f"\nExp: {expiry_date.strftime('%m/%d/%Y')}" if expiry_date else "",
+    })
 
 
 class TicketService:
     """Service for generating product tickets and labels"""
     
     @staticmethod
-    def generate_product_ticket(product: Product, include_qr: bool = True) -> bytes:
-        """Generate a single product ticket/label as PDF"""
+    def generate_product_ticket(product: Product, include_qr: bool = True) -> io.BytesIO:
+        """Generate a single product ticket/label as a PDF buffer positioned at the start
+        
+        A ticket is a single fixed-size page, so it is drawn straight onto a canvas
+        instead of going through the SimpleDocTemplate layout engine.
+        """
         buffer = io.BytesIO()
         
         # Create PDF with custom page size (ticket size)
         ticket_width = 4 * inch  # 4 inches wide
         ticket_height = 2.5 * inch  # 2.5 inches tall
+        margin = 0.2 * inch
+        center = ticket_width / 2
         
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=(ticket_width, ticket_height),
-            rightMargin=0.2*inch,
-            leftMargin=0.2*inch,
-            topMargin=0.2*inch,
-            bottomMargin=0.2*inch
-        )
-        
-        # Build content
-        story = []
-        styles = getSampleStyleSheet()
-        
-        # Custom styles
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading2'],
-            fontSize=12,
-            spaceAfter=6,
-            alignment=1,  # Center
-            textColor=colors.black
-        )
-        
-        normal_style = ParagraphStyle(
-            'CustomNormal',
-            parent=styles['Normal'],
-            fontSize=9,
-            spaceAfter=3,
-            alignment=1,  # Center
-        )
+        c = canvas.Canvas(buffer, pagesize=(ticket_width, ticket_height))
         
-        # Product name
-        story.append(Paragraph(product.name[:30], title_style))
+        # Product name and price
+        y = ticket_height - margin - 12
+        c.setFont('Helvetica-Bold', 12)
+        c.drawCentredString(center, y, product.name[:30])
+        y -= 16
+        c.drawCentredString(center, y, f"${product.price:.2f}")
         
-        # Price
-        price_text = f"<b>${product.price:.2f}</b>"
-        story.append(Paragraph(price_text, title_style))
+        # QR Code with product info (optional), placed to the right of the barcode
+        code_width, code_height, gap = 2.5 * inch, 0.8 * inch, 0.15 * inch
+        qr_drawing = None
+        if include_qr:
+            try:
+                qr_text = f"Product: {product.name}\nBarcode: {product.barcode}\nPrice: ${product.price}"
+                qr_drawing = TicketService._qr_drawing(qr_text, code_height)
+            except Exception:
+                pass  # Skip QR if generation fails
         
-        # Generate barcode
+        # Barcode, drawn as vector graphics
+        y -= 6 + code_height
+        x = center - (code_width + (gap + code_height if qr_drawing else 0)) / 2
         try:
-            barcode_img = BarcodeService.generate_barcode_image(product.barcode)
-            barcode_buffer = io.BytesIO(barcode_img)
-            
-            # Add barcode image
-            barcode_image = RLImage(barcode_buffer, width=2.5*inch, height=0.8*inch)
-            story.append(barcode_image)
-            
-        except Exception as e:
+            TicketService._barcode_drawing(product.barcode, code_width, code_height).drawOn(c, x, y)
+        except Exception:
             # Fallback to text if barcode generation fails
-            story.append(Paragraph(f"Barcode: {product.barcode}", normal_style))
+            c.setFont('Helvetica', 9)
+            c.drawCentredString(x + code_width / 2, y + code_height / 2, f"Barcode: {product.barcode}")
+        if qr_drawing:
+            qr_drawing.drawOn(c, x + code_width + gap, y)
         
         # Product details
         details = []
@@ -194,69 +288,55 @@ class TicketService:
         if product.weight:
             details.append(f"Weight: {product.weight}")
         
-        for detail in details:
-            story.append(Paragraph(detail, normal_style))
-        
         # Expiry date
         if product.expiry_date:
-            expiry_text = f"Exp: {product.expiry_date.strftime('%m/%d/%Y')}"
-            story.append(Paragraph(expiry_text, normal_style))
+            details.append(f"Exp: {product.expiry_date.strftime('%m/%d/%Y')}")
         
-        # QR Code with product info (optional)
-        if include_qr:
-            try:
-                qr_data = {
-                    'name': product.name,
-                    'barcode': product.barcode,
-                    'price': str(product.price),
-                    'id': str(product.id)
-                }
-                qr_text = f"Product: {product.name}\nBarcode: {product.barcode}\nPrice: ${product.price}"
-                qr_img = BarcodeService.generate_qr_code(qr_text)
-                qr_buffer = io.BytesIO(qr_img)
-                
-                qr_image = RLImage(qr_buffer, width=0.8*inch, height=0.8*inch)
-                story.append(qr_image)
-            except Exception:
-                pass  # Skip QR if generation fails
+        c.setFont('Helvetica', 9)
+        for detail in details:
+            y -= 11
+            c.drawCentredString(center, y, detail)
         
-        # Build PDF
-        doc.build(story)
+        c.showPage()
+        c.save()
         buffer.seek(0)
-        return buffer.getvalue()
+        return buffer
+    
+    # Product fields printed on bulk tickets, see generate_bulk_tickets_from_values()
+    BULK_TICKET_FIELDS = ('name', 'price', 'barcode', 'brand', 'expiry_date')
     
     @staticmethod
-    def generate_bulk_tickets(products: List[Product], tickets_per_page: int = 8) -> bytes:
+    def generate_bulk_tickets(products: List[Product], tickets_per_page: int = 8) -> io.BytesIO:
         """Generate multiple product tickets in a single PDF"""
+        rows = [
+            {field: getattr(product, field) for field in TicketService.BULK_TICKET_FIELDS}
+            for product in products
+        ]
+        return TicketService.generate_bulk_tickets_from_values(rows, tickets_per_page)
+    
+    @staticmethod
+    def generate_bulk_tickets_from_values(rows: List[Dict[str, Any]], tickets_per_page: int = 8) -> io.BytesIO:
+        """Generate bulk tickets from ``values(*BULK_TICKET_FIELDS)`` rows instead of model instances"""
         buffer = io.BytesIO()
         doc = SimpleDocTemplate(buffer, pagesize=A4)
         
         story = []
-        styles = getSampleStyleSheet()
         
         # Title
-        title_style = ParagraphStyle(
-            'Title',
-            parent=styles['Title'],
-            fontSize=16,
-            spaceAfter=20,
-            alignment=1
-        )
-        
-        story.append(Paragraph("Product Tickets", title_style))
+        story.append(Paragraph("Product Tickets", _BULK_TITLE_STYLE))
         story.append(Spacer(1, 20))
         
         # Create table for tickets
         tickets_data = []
         current_row = []
         
-        for i, product in enumerate(products):
+        for i, row in enumerate(rows):
             # Generate individual ticket content
-            ticket_content = TicketService._create_ticket_cell_content(product)
+            ticket_content = TicketService._create_ticket_cell_content(row)
             current_row.append(ticket_content)
             
             # If we have 2 tickets in a row or it's the last product
-            if len(current_row) == 2 or i == len(products) - 1:
+            if len(current_row) == 2 or i == len(rows) - 1:
                 # Pad row if needed
                 while len(current_row) < 2:
                     current_row.append("")
@@ -281,33 +361,87 @@ class TicketService:
         
         doc.build(story)
         buffer.seek(0)
-        return buffer.getvalue()
+        return buffer
     
     @staticmethod
-    def _create_ticket_cell_content(product: Product) -> str:
-        """Create HTML content for a single ticket cell"""
-        content = f"""
-        <b>{product.name[:25]}</b><br/>
-        <font size="12"><b>${product.price:.2f}</b></font><br/>
-        Barcode: {product.barcode}<br/>
-        """
-        
-        if product.brand:
-            content += f"Brand: {product.brand}<br/>"
-        
-        if product.expiry_date:
-            content += f"Exp: {product.expiry_date.strftime('%m/%d/%Y')}<br/>"
-        
-        return content
+    def _barcode_drawing(code: str, width: float, height: float) -> Drawing:
+        """Code 128 barcode as a ReportLab drawing, embedded as vectors rather than a PNG"""
+        widget = BarcodeCode128(value=code, humanReadable=True)
+        widget.validate()
+        if not widget.valid:
+            raise ValueError(f"Illegal Code 128 barcode value '{code}'")
+        
+        # Lay the bars out once and scale the resulting shapes; createBarcodeDrawing()
+        # would draw the widget for sizing and the renderer would draw it again
+        bars = widget.draw()
+        x1, y1, x2, y2 = bars.getBounds()
+        sx, sy = width / (x2 - x1), height / (y2 - y1)
+        drawing = Drawing(width, height, transform=[sx, 0, 0, sy, -sx * x1, -sy * y1])
+        drawing.add(bars)
+        return drawing
+    
+    @staticmethod
+    def _qr_drawing(text: str, size: float) -> Drawing:
+        """QR code as a size x size ReportLab drawing, embedded as vectors rather than a PNG"""
+        qr_code = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_L, border=4)
+        qr_code.add_data(text)
+        qr_code.make(fit=True)
+        matrix = qr_code.get_matrix()
+        n = len(matrix)
+        
+        # One path with a rectangle per horizontal run of dark modules; reportlab's
+        # QrCodeWidget emits a separate shape per module, which is much slower to render
+        path = Path(fillColor=colors.black, strokeColor=None, strokeWidth=0)
+        for row_index, row in enumerate(matrix):
+            top = n - row_index
+            x = 0
+            while x < n:
+                if not row[x]:
+                    x += 1
+                    continue
+                start = x
+                while x < n and row[x]:
+                    x += 1
+                path.moveTo(start, top)
+                path.lineTo(x, top)
+                path.lineTo(x, top - 1)
+                path.lineTo(start, top - 1)
+                path.closePath()
+        
+        drawing = Drawing(size, size, transform=[size / n, 0, 0, size / n, 0, 0])
+        drawing.add(path)
+        return drawing
+    
+    @staticmethod
+    def _create_ticket_cell_content(row: Dict[str, Any]) -> str:
+        """Create the text for a single ticket cell from a BULK_TICKET_FIELDS row"""
+        return _ticket_cell_content(
+            row['name'], row['price'], row['barcode'], row['brand'], row['expiry_date']
+        )
+    
+    # Product fields printed on barcode sheets, see generate_barcode_sheet_from_values()
+    BARCODE_SHEET_FIELDS = ('name', 'price', 'barcode')
     
     @staticmethod
-    def generate_barcode_sheet(products: List[Product], barcodes_per_page: int = 20) -> bytes:
+    def generate_barcode_sheet(products: List[Product], barcodes_per_page: int = 20) -> io.BytesIO:
         """Generate a sheet with just barcodes for multiple products"""
+        rows = (
+            {field: getattr(product, field) for field in TicketService.BARCODE_SHEET_FIELDS}
+            for product in products
+        )
+        return TicketService.generate_barcode_sheet_from_values(rows, barcodes_per_page)
+    
+    @staticmethod
+    def generate_barcode_sheet_from_values(rows: Iterable[Dict[str, Any]], barcodes_per_page: int = 20) -> io.BytesIO:
+        """Generate a barcode sheet from ``values(*BARCODE_SHEET_FIELDS)`` rows
+        
+        ``rows`` is consumed once, so a ``QuerySet.iterator()`` can be passed.
+        """
         buffer = io.BytesIO()
         doc = SimpleDocTemplate(buffer, pagesize=A4)
         
         story = []
-        styles = getSampleStyleSheet()
+        styles = _STYLES
         
         # Title
         title = Paragraph("Product Barcodes", styles['Title'])
@@ -318,33 +452,30 @@ class TicketService:
         barcode_data = []
         current_row = []
         
-        for i, product in enumerate(products):
+        for row in rows:
             try:
-                # Generate barcode image
-                barcode_img = BarcodeService.generate_barcode_image(product.barcode)
-                barcode_buffer = io.BytesIO(barcode_img)
-                
                 # Create barcode cell content
                 barcode_content = [
-                    RLImage(barcode_buffer, width=2*inch, height=0.6*inch),
-                    Paragraph(f"{product.name[:20]}", styles['Normal']),
-                    Paragraph(f"${product.price:.2f}", styles['Normal'])
+                    TicketService._barcode_drawing(row['barcode'], 2*inch, 0.6*inch),
+                    Paragraph(f"{row['name'][:20]}", styles['Normal']),
+                    Paragraph(f"${row['price']:.2f}", styles['Normal'])
                 ]
-                
-                current_row.append(barcode_content)
-                
-                # If we have 3 barcodes in a row or it's the last product
-                if len(current_row) == 3 or i == len(products) - 1:
-                    # Pad row if needed
-                    while len(current_row) < 3:
-                        current_row.append("")
-                    
-                    barcode_data.append(current_row)
-                    current_row = []
-                    
             except Exception as e:
                 # Skip products with barcode generation errors
                 continue
+            
+            current_row.append(barcode_content)
+            
+            # If we have 3 barcodes in a row
+            if len(current_row) == 3:
+                barcode_data.append(current_row)
+                current_row = []
+        
+        if current_row:
+            # Pad the last row
+            while len(current_row) < 3:
+                current_row.append("")
+            barcode_data.append(current_row)
         
         if barcode_data:
             table = Table(barcode_data, colWidths=[2.2*inch, 2.2*inch, 2.2*inch])
@@ -360,7 +491,7 @@ class TicketService:
         
         doc.build(story)
         buffer.seek(0)
-        return buffer.getvalue()
+        return buffer
 
 
 class ProductService:
@@ -373,26 +504,94 @@ class ProductService:
         if not product_data.get('barcode'):
             product_data['barcode'] = BarcodeService.generate_barcode_number()
         
-        # Create product
-        product = Product.objects.create(**product_data)
-        
-        # Create barcode record
-        BarcodeService.create_product_barcode(product)
+        # Product and barcode rows are written in one transaction
+        with transaction.atomic():
+            product = Product.objects.create(**product_data)
+            BarcodeService.create_product_barcode(product)
         
         return product
     
     @staticmethod
     def bulk_create_products_with_barcodes(products_data: List[Dict[str, Any]], user=None) -> List[Product]:
-        """Create multiple products with barcodes"""
+        """Create multiple products with barcodes using batched inserts.
+        
+        If the batch is rejected (e.g. a duplicate barcode), the products are
+        created one by one instead so valid rows are still saved.
+        """
+        products_data = list(products_data)
+        missing = [data for data in products_data if not data.get('barcode')]
+        for data, code in zip(missing, BarcodeService.generate_barcode_numbers(len(missing))):
+            data['barcode'] = code
+        
+        try:
+            products = [Product(**data) for data in products_data]
+            with transaction.atomic():
+                Product.objects.bulk_create(products, batch_size=500)
+                BarcodeService.create_product_barcodes(products)
+        except IntegrityError:
+            logger.exception("Batched product insert failed, creating products one by one")
+            return ProductService._create_products_one_by_one(products_data, user)
+        
+        # bulk_create() sends no post_save signals
+        owner_ids = Supermarket.objects.filter(
+            pk__in={product.supermarket_id for product in products}
+        ).values_list('owner_id', flat=True)
+        for owner_id in set(owner_ids):
+            invalidate_owner_cache(owner_id)
+        return products
+    
+    @staticmethod
+    def _create_products_one_by_one(products_data: List[Dict[str, Any]], user=None) -> List[Product]:
         created_products = []
         
         for product_data in products_data:
             try:
+                # Runs in its own atomic block, so a failed row does not break the others
                 product = ProductService.create_product_with_barcode(product_data, user)
                 created_products.append(product)
-            except Exception as e:
+            except Exception:
                 # Log error but continue with other products
-                print(f"Error creating product {product_data.get('name', 'Unknown')}: {str(e)}")
+                logger.exception("Error creating product %s", product_data.get('name', 'Unknown'))
                 continue
         
-        return created_products
\ No newline at end of file
+        return created_products
+
+
+class ProductStatsService:
+    """Service for the mv_product_stats materialized view"""
+    
+    @staticmethod
+    def is_enabled() -> bool:
+        """Whether stats should be served from the materialized view"""
+        return (
+            getattr(settings, 'INVENTORY_STATS_MATERIALIZED_VIEW', False)
+            and connection.vendor == 'postgresql'
+        )
+    
+    @staticmethod
+    def refresh(concurrently: bool = True) -> None:
+        """Refresh the materialized view (CONCURRENTLY keeps it readable)"""
+        keyword = 'CONCURRENTLY ' if concurrently else ''
+        with connection.cursor() as cursor:
+            cursor.execute(f'REFRESH MATERIALIZED VIEW {keyword}mv_product_stats')
+    
+    @staticmethod
+    def get_owner_stats(user) -> Dict[str, Any]:
+        """Combine the per-supermarket snapshot rows of all stores owned by user"""
+        totals = ProductStatsSnapshot.objects.filter(
+            supermarket__owner=user
+        ).aggregate(
+            total_products=Sum('total_products'),
+            total_value=Sum('total_value'),
+            low_stock_count=Sum('low_stock_count'),
+            expired_count=Sum('expired_count'),
+            expiring_soon_count=Sum('expiring_soon_count'),
+            out_of_stock_count=Sum('out_of_stock_count'),
+            margin_sum=Sum('margin_sum'),
+            margin_count=Sum('margin_count'),
+        )
+        margin_sum = totals.pop('margin_sum') or 0
+        margin_count = totals.pop('margin_count') or 0
+        stats = {key: value or 0 for key, value in totals.items()}
+        stats['average_profit_margin'] = round(margin_sum / margin_count, 2) if margin_count else 0
+        return stats
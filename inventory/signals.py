@@ -0,0 +1,53 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from supermarkets.models import Supermarket
+from .cache import invalidate_owner_cache
+from .models import Product, ProductImage, Barcode, Category, Supplier
+
+
+def _supermarket_owner_id(supermarket_id):
+    return Supermarket.objects.filter(pk=supermarket_id).values_list('owner_id', flat=True).first()
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_cache(sender, instance, **kwargs):
+    """Invalidate cached product responses when a product changes"""
+    invalidate_owner_cache(_supermarket_owner_id(instance.supermarket_id))
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_save, sender=Barcode)
+@receiver(post_delete, sender=Barcode)
+def invalidate_product_related_cache(sender, instance, **kwargs):
+    """Invalidate cached product responses when product images or barcodes change"""
+    owner_id = Product.objects.filter(
+        pk=instance.product_id
+    ).values_list('supermarket__owner_id', flat=True).first()
+    invalidate_owner_cache(owner_id)
+
+
+@receiver(post_save, sender=ProductImage)
+def cache_product_image_url(sender, instance, **kwargs):
+    """Store the image URL so serializers need not resolve it through storage"""
+    url = instance.image.url if instance.image else ''
+    if instance.image_url_cached != url:
+        instance.image_url_cached = url
+        ProductImage.objects.filter(pk=instance.pk).update(image_url_cached=url)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Supplier)
+@receiver(post_delete, sender=Supplier)
+def invalidate_catalog_cache(sender, instance, **kwargs):
+    """Category and supplier names are rendered in product responses"""
+    invalidate_owner_cache(instance.created_by_id)
+
+
+@receiver(post_save, sender=Supermarket)
+@receiver(post_delete, sender=Supermarket)
+def invalidate_supermarket_cache(sender, instance, **kwargs):
+    """Supermarket names are rendered in product responses"""
+    invalidate_owner_cache(instance.owner_id)
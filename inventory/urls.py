@@ -16,6 +16,8 @@ urlpatterns = [
     path('products/<uuid:product_id>/stock/', views.ProductStockUpdateView.as_view(), name='product_stock_update'),
     path('products/bulk-update/', views.BulkProductUpdateView.as_view(), name='bulk_product_update'),
     path('products/stats/', views.ProductStatsView.as_view(), name='product_stats'),
+    path('products/export/', views.ProductExportView.as_view(), name='product_export'),
+    path('products/barcode/bulk-search/', views.search_products_by_barcodes, name='bulk_search_by_barcode'),
     path('products/barcode/<str:barcode>/', views.search_products_by_barcode, name='search_by_barcode'),
     
     # Stock Movements
@@ -25,6 +27,8 @@ urlpatterns = [
     path('alerts/', views.ProductAlertListView.as_view(), name='product_alert_list'),
     path('alerts/<int:alert_id>/read/', views.mark_alert_as_read, name='mark_alert_read'),
     path('alerts/<int:alert_id>/resolve/', views.resolve_alert, name='resolve_alert'),
+    path('alerts/bulk-read/', views.bulk_mark_alerts_as_read, name='bulk_mark_alerts_read'),
+    path('alerts/bulk-resolve/', views.bulk_resolve_alerts, name='bulk_resolve_alerts'),
     
     # Reviews
     path('reviews/', views.ProductReviewListCreateView.as_view(), name='product_review_list_create'),
@@ -2,26 +2,74 @@ from rest_framework import generics, status, permissions, filters
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework.pagination import CursorPagination
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q, Sum, Avg, Count
+from django.db import transaction
+from django.db.models import F, Q, Sum, Avg, Count, Case, When, FloatField, Prefetch, Exists, OuterRef
 from django.utils import timezone
-from django.http import HttpResponse
+from django.utils.http import content_disposition_header
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from datetime import timedelta
 from decimal import Decimal
+import csv
 
 from .models import (
     Category, Supplier, Product, ProductImage, StockMovement,
-    ProductAlert, Barcode, ProductReview, Clearance
+    ProductAlert, Barcode, ProductReview, Clearance, ClearanceBundleItem
 )
 from .serializers import (
-    CategorySerializer, SupplierSerializer, ProductListSerializer,
+    CategorySerializer, SupplierSerializer, ProductListSerializer, ProductListLightSerializer,
     ProductDetailSerializer, ProductCreateUpdateSerializer, StockMovementSerializer,
     ProductAlertSerializer, BarcodeSerializer, ProductReviewSerializer,
-    BulkProductUpdateSerializer, ProductStatsSerializer, ProductImageSerializer,
-    ClearanceSerializer
+    BulkProductUpdateSerializer, BulkAlertActionSerializer, BulkBarcodeSearchSerializer,
+    ProductStatsSerializer, ProductImageSerializer, ClearanceSerializer
 )
-from .filters import ProductFilter
-from .services import BarcodeService, TicketService, ProductService
+from .filters import ProductFilter, ProductSearchFilter
+from .cache import (
+    BARCODE_LOOKUP_CACHE_TIMEOUT, PRODUCT_LIST_CACHE_TIMEOUT, PRODUCT_STATS_CACHE_TIMEOUT,
+    PRODUCT_TICKET_CACHE_TIMEOUT, owner_cached, query_params_key, invalidate_owner_cache
+)
+from .services import BarcodeService, TicketService, ProductService, ProductStatsService
+
+
+class ProductCursorPagination(CursorPagination):
+    """Keyset pagination for the product list; deep pages cost the same as the first"""
+    ordering = ('-added_date', 'id')
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class MovementCursorPagination(CursorPagination):
+    """Keyset pagination for the stock movement history"""
+    ordering = '-created_at'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class AlertCursorPagination(CursorPagination):
+    """Keyset pagination for the alert list"""
+    ordering = '-created_at'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+def _category_count_annotations():
+    """Counts rendered by CategorySerializer, computed in the category query"""
+    return {
+        'subcategories_count': Count(
+            'subcategories', filter=Q(subcategories__is_active=True), distinct=True
+        ),
+        'products_count': Count(
+            'product', filter=Q(product__is_active=True), distinct=True
+        ),
+    }
+
+
+def _supplier_count_annotations():
+    """Counts rendered by SupplierSerializer, computed in the supplier query"""
+    return {
+        'products_count': Count('product', filter=Q(product__is_active=True)),
+    }
 
 
 class CategoryListCreateView(generics.ListCreateAPIView):
@@ -40,7 +88,7 @@ class CategoryListCreateView(generics.ListCreateAPIView):
         return Category.objects.filter(
             created_by=self.request.user,
             is_active=True
-        )
+        ).select_related('parent').annotate(**_category_count_annotations())
     
     def perform_create(self, serializer):
         """Set the created_by field to current user"""
@@ -55,7 +103,9 @@ class CategoryDetailView(generics.RetrieveUpdateDestroyAPIView):
     
     def get_queryset(self):
         """Filter categories by current user"""
-        return Category.objects.filter(created_by=self.request.user)
+        return Category.objects.filter(
+            created_by=self.request.user
+        ).select_related('parent').annotate(**_category_count_annotations())
 
 
 class SupplierListCreateView(generics.ListCreateAPIView):
@@ -74,7 +124,7 @@ class SupplierListCreateView(generics.ListCreateAPIView):
         return Supplier.objects.filter(
             created_by=self.request.user,
             is_active=True
-        )
+        ).annotate(**_supplier_count_annotations())
     
     def perform_create(self, serializer):
         """Set the created_by field to current user"""
@@ -89,18 +139,41 @@ class SupplierDetailView(generics.RetrieveUpdateDestroyAPIView):
     
     def get_queryset(self):
         """Filter suppliers by current user"""
-        return Supplier.objects.filter(created_by=self.request.user)
+        return Supplier.objects.filter(
+            created_by=self.request.user
+        ).annotate(**_supplier_count_annotations())
 
 
 class ProductListCreateView(generics.ListCreateAPIView):
     """List and create products"""
     
+    # Row projection rendered by ProductListLightSerializer
+    list_fields = [
+        'id', 'name', 'barcode', 'quantity', 'min_stock_level', 'price',
+        'selling_price', 'expiry_date', 'location', 'image', 'is_active',
+        'added_date', 'supermarket',
+    ]
+    list_values = {
+        'category_name': F('category__name'),
+        'supplier_name': F('supplier__name'),
+        'supermarket_name': F('supermarket__name'),
+        'supermarket_parent': F('supermarket__parent'),
+        'supermarket_parent_name': F('supermarket__parent__name'),
+        'is_low_stock': F('annotated_is_low_stock'),
+        'is_expired': F('annotated_is_expired'),
+        'is_expiring_soon': F('annotated_is_expiring_soon'),
+        'expiry_delta': F('annotated_expiry_delta'),
+        'total_value': F('annotated_total_value'),
+    }
+    
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = ProductCursorPagination
+    filter_backends = [DjangoFilterBackend, ProductSearchFilter, filters.OrderingFilter]
     filterset_class = ProductFilter
     search_fields = ['name', 'barcode', 'brand', 'description']
     ordering_fields = ['name', 'price', 'quantity', 'expiry_date', 'added_date']
-    ordering = ['-added_date']
+    # id breaks added_date ties so the keyset order is total and matches the index
+    ordering = ['-added_date', 'id']
     
     def get_queryset(self):
         user = self.request.user
@@ -108,7 +181,31 @@ class ProductListCreateView(generics.ListCreateAPIView):
         return Product.objects.filter(
             supermarket__owner=user,
             is_active=True
-        ).select_related('category', 'supplier', 'supermarket')
+        ).with_stock_status()
+    
+    def list(self, request, *args, **kwargs):
+        # Cache-aside: invalidated by the signals in inventory/signals.py
+        data = owner_cached(
+            'product_list', request.user.id, (query_params_key(request.query_params),),
+            lambda: self.list_rows(request), PRODUCT_LIST_CACHE_TIMEOUT
+        )
+        return Response(data)
+    
+    def list_rows(self, request):
+        """Serialize the filtered page from plain rows instead of model instances"""
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.values(*self.list_fields, **self.list_values)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            serializer = ProductListLightSerializer(page, many=True, context=self.get_serializer_context())
+            return self.get_paginated_response(serializer.data).data
+        return ProductListLightSerializer(rows, many=True, context=self.get_serializer_context()).data
+    
+    def get_serializer(self, *args, **kwargs):
+        # A list payload creates the products in bulk, see ProductCreateUpdateSerializer.create_many()
+        if isinstance(kwargs.get('data'), list):
+            kwargs['many'] = True
+        return super().get_serializer(*args, **kwargs)
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -116,6 +213,49 @@ class ProductListCreateView(generics.ListCreateAPIView):
         return ProductListSerializer
 
 
+class _Echo:
+    """File-like object whose write() hands the value back to csv.writer"""
+    
+    def write(self, value):
+        return value
+
+
+class ProductExportView(ProductListCreateView):
+    """Stream the filtered product list as CSV"""
+    
+    http_method_names = ['get', 'head', 'options']
+    export_chunk_size = 2000
+    
+    def get(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.values(*self.list_fields, **self.list_values).iterator(
+            chunk_size=self.export_chunk_size
+        )
+        serializer = ProductListLightSerializer(context=self.get_serializer_context())
+        writer = csv.DictWriter(_Echo(), fieldnames=list(serializer.fields))
+        
+        def stream():
+            yield writer.writeheader()
+            for row in rows:
+                yield writer.writerow(serializer.to_representation(row))
+        
+        response = StreamingHttpResponse(stream(), content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="products.csv"'
+        return response
+
+
+def _product_detail_prefetches():
+    """Prefetch the reverse relations rendered by ProductDetailSerializer"""
+    return [
+        Prefetch('images', queryset=ProductImage.objects.only(
+            'id', 'image_url_cached', 'alt_text', 'is_primary', 'uploaded_at', 'product_id'
+        )),
+        Prefetch('barcodes', queryset=Barcode.objects.only(
+            'id', 'code', 'barcode_type', 'is_primary', 'created_at', 'product_id'
+        )),
+    ]
+
+
 class ProductDetailView(generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete products"""
     
@@ -123,9 +263,12 @@ class ProductDetailView(generics.RetrieveUpdateDestroyAPIView):
     
     def get_queryset(self):
         user = self.request.user
-        return Product.objects.filter(
+        queryset = Product.objects.filter(
             supermarket__owner=user
         ).select_related('category', 'supplier', 'supermarket', 'created_by')
+        if self.request.method == 'GET':
+            queryset = queryset.with_valuation().prefetch_related(*_product_detail_prefetches())
+        return queryset
     
     def get_serializer_class(self):
         if self.request.method in ['PUT', 'PATCH']:
@@ -139,75 +282,95 @@ class ProductStockUpdateView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def post(self, request, product_id):
-        try:
-            product = Product.objects.get(
-                id=product_id,
-                supermarket__owner=request.user
-            )
-        except Product.DoesNotExist:
-            return Response(
-                {'error': 'Product not found'},
-                status=status.HTTP_404_NOT_FOUND
-            )
-        
-        movement_type = request.data.get('movement_type')
-        quantity_change = request.data.get('quantity', 0)
-        unit_cost = request.data.get('unit_cost')
-        reference = request.data.get('reference', '')
-        notes = request.data.get('notes', '')
-        
-        if not movement_type or quantity_change == 0:
-            return Response(
-                {'error': 'Movement type and quantity are required'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        previous_quantity = product.quantity
-        
-        # Calculate new quantity based on movement type
-        if movement_type in ['IN', 'RETURNED']:
-            new_quantity = previous_quantity + abs(quantity_change)
-        elif movement_type in ['OUT', 'EXPIRED', 'DAMAGED']:
-            new_quantity = max(0, previous_quantity - abs(quantity_change))
-        elif movement_type == 'ADJUSTMENT':
-            new_quantity = quantity_change  # Direct quantity set
-        else:
-            return Response(
-                {'error': 'Invalid movement type'},
-                status=status.HTTP_400_BAD_REQUEST
+        with transaction.atomic():
+            try:
+                # Lock the product row until the movement is recorded so concurrent
+                # stock updates cannot compute from the same previous quantity
+                product = Product.objects.select_related(
+                    'category', 'supplier', 'supermarket', 'supermarket__parent'
+                ).select_for_update(of=('self',)).get(
+                    id=product_id,
+                    supermarket__owner=request.user
+                )
+            except Product.DoesNotExist:
+                return Response(
+                    {'error': 'Product not found'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            
+            movement_type = request.data.get('movement_type')
+            quantity_change = request.data.get('quantity', 0)
+            unit_cost = request.data.get('unit_cost')
+            reference = request.data.get('reference', '')
+            notes = request.data.get('notes', '')
+            
+            if not movement_type or quantity_change == 0:
+                return Response(
+                    {'error': 'Movement type and quantity are required'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            previous_quantity = product.quantity
+            
+            # Calculate new quantity based on movement type
+            if movement_type in ['IN', 'RETURNED']:
+                new_quantity = previous_quantity + abs(quantity_change)
+            elif movement_type in ['OUT', 'EXPIRED', 'DAMAGED']:
+                new_quantity = max(0, previous_quantity - abs(quantity_change))
+            elif movement_type == 'ADJUSTMENT':
+                new_quantity = quantity_change  # Direct quantity set
+            else:
+                return Response(
+                    {'error': 'Invalid movement type'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            # Update product quantity
+            product.quantity = new_quantity
+            product.save(update_fields=['quantity', 'updated_date'])
+            
+            # Create stock movement record
+            total_cost = None
+            if unit_cost:
+                total_cost = Decimal(str(unit_cost)) * abs(quantity_change)
+            
+            StockMovement.objects.create(
+                product=product,
+                movement_type=movement_type,
+                quantity=quantity_change if movement_type != 'ADJUSTMENT' else new_quantity - previous_quantity,
+                previous_quantity=previous_quantity,
+                new_quantity=new_quantity,
+                unit_cost=unit_cost,
+                total_cost=total_cost,
+                reference=reference,
+                notes=notes,
+                created_by=request.user
             )
+            
+            # Reload with the stock/expiry flags computed in SQL; they drive
+            # both the alerts and the response. Clients that only need the new
+            # quantity can pass include_product=false to skip the joins and the
+            # serialized product.
+            include_product = request.GET.get('include_product', 'true').lower() == 'true'
+            products = Product.objects.with_stock_status()
+            if include_product:
+                products = products.select_related(
+                    'category', 'supplier', 'supermarket', 'supermarket__parent'
+                )
+            product = products.get(pk=product.pk)
+            
+            # Check for alerts
+            self.check_and_create_alerts(product)
         
-        # Update product quantity
-        product.quantity = new_quantity
-        product.save()
-        
-        # Create stock movement record
-        total_cost = None
-        if unit_cost:
-            total_cost = Decimal(str(unit_cost)) * abs(quantity_change)
-        
-        StockMovement.objects.create(
-            product=product,
-            movement_type=movement_type,
-            quantity=quantity_change if movement_type != 'ADJUSTMENT' else new_quantity - previous_quantity,
-            previous_quantity=previous_quantity,
-            new_quantity=new_quantity,
-            unit_cost=unit_cost,
-            total_cost=total_cost,
-            reference=reference,
-            notes=notes,
-            created_by=request.user
-        )
-        
-        # Check for alerts
-        self.check_and_create_alerts(product)
-        
-        return Response({
+        data = {
             'message': 'Stock updated successfully',
+            'product_id': product.id,
             'previous_quantity': previous_quantity,
             'new_quantity': new_quantity,
-            'product': ProductListSerializer(product).data
-        })
+        }
+        if include_product:
+            data['product'] = ProductListSerializer(product).data
+        return Response(data)
     
     def check_and_create_alerts(self, product):
         """Check and create alerts for the product"""
@@ -247,14 +410,12 @@ class ProductStockUpdateView(APIView):
                 message=f'{product.name} has expired.'
             ))
         
-        # Bulk create alerts (avoiding duplicates)
-        for alert in alerts_to_create:
-            if not ProductAlert.objects.filter(
-                product=product,
-                alert_type=alert.alert_type,
-                is_resolved=False
-            ).exists():
-                alert.save()
+        if not alerts_to_create:
+            return
+        
+        # Bulk create alerts; uq_open_product_alert makes the database skip
+        # types that already have an unresolved alert
+        ProductAlert.objects.bulk_create(alerts_to_create, ignore_conflicts=True)
 
 
 class BulkProductUpdateView(APIView):
@@ -263,25 +424,20 @@ class BulkProductUpdateView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def post(self, request):
-        serializer = BulkProductUpdateSerializer(data=request.data)
+        serializer = BulkProductUpdateSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
-            product_ids = serializer.validated_data['product_ids']
-            updates = serializer.validated_data['updates']
-            
             # Filter products by user's supermarkets
-            products = Product.objects.filter(
-                id__in=product_ids,
-                supermarket__owner=request.user
-            )
+            products = Product.objects.filter(supermarket__owner=request.user)
             
-            if not products.exists():
+            # Update products; the row count doubles as the existence check
+            updated_count = serializer.apply(products)
+            if updated_count == 0:
                 return Response(
                     {'error': 'No products found'},
                     status=status.HTTP_404_NOT_FOUND
                 )
-            
-            # Update products
-            updated_count = products.update(**updates)
+            # QuerySet.update() does not send post_save
+            invalidate_owner_cache(request.user.id)
             
             return Response({
                 'message': f'{updated_count} products updated successfully',
@@ -297,66 +453,82 @@ class ProductStatsView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request):
-        user = request.user
+        # Cache-aside: invalidated by the signals in inventory/signals.py
+        data = owner_cached(
+            'product_stats', request.user.id, (),
+            lambda: self.stats_data(request.user), PRODUCT_STATS_CACHE_TIMEOUT
+        )
+        return Response(data)
+    
+    def stats_data(self, user):
+        """Serialized statistics of the user's active products"""
         products = Product.objects.filter(
             supermarket__owner=user,
             is_active=True
         )
         
-        # Calculate statistics
-        total_products = products.count()
-        total_value = products.aggregate(
-            total=Sum('quantity') * Sum('price')
-        )['total'] or 0
-        
-        low_stock_count = products.filter(
-            quantity__lte=models.F('min_stock_level')
-        ).count()
-        
-        expired_count = products.filter(
-            expiry_date__lt=timezone.now().date()
-        ).count()
-        
-        expiring_soon_count = products.filter(
-            expiry_date__lte=timezone.now().date() + timedelta(days=7),
-            expiry_date__gt=timezone.now().date()
-        ).count()
-        
-        out_of_stock_count = products.filter(quantity=0).count()
-        
-        categories_count = Category.objects.filter(
-            created_by=user,
-            product__in=products
-        ).distinct().count()
-        
-        suppliers_count = Supplier.objects.filter(
-            created_by=user,
-            product__in=products
-        ).distinct().count()
-        
-        # Calculate average profit margin
-        profit_margins = []
-        for product in products.filter(cost_price__gt=0):
-            if product.selling_price > product.cost_price:
-                margin = ((product.selling_price - product.cost_price) / product.cost_price) * 100
-                profit_margins.append(margin)
-        
-        average_profit_margin = sum(profit_margins) / len(profit_margins) if profit_margins else 0
+        if ProductStatsService.is_enabled():
+            # Precomputed per-supermarket rows, refreshed by refresh_product_stats
+            stats = ProductStatsService.get_owner_stats(user)
+            stats.update(self.used_relation_counts(user, products))
+        else:
+            stats = self.compute_stats(products, user)
         
-        stats = {
-            'total_products': total_products,
-            'total_value': total_value,
-            'low_stock_count': low_stock_count,
-            'expired_count': expired_count,
-            'expiring_soon_count': expiring_soon_count,
-            'out_of_stock_count': out_of_stock_count,
-            'categories_count': categories_count,
-            'suppliers_count': suppliers_count,
-            'average_profit_margin': round(average_profit_margin, 2)
+        return ProductStatsSerializer(stats).data
+    
+    @staticmethod
+    def relation_counts(user):
+        """Aggregates counting the user's categories and suppliers used by the products"""
+        return {
+            'categories_count': Count('category', distinct=True, filter=Q(category__created_by=user)),
+            'suppliers_count': Count('supplier', distinct=True, filter=Q(supplier__created_by=user)),
         }
+    
+    @staticmethod
+    def used_relation_counts(user, products):
+        """Count the user's categories and suppliers used by the products.
         
-        serializer = ProductStatsSerializer(stats)
-        return Response(serializer.data)
+        Distinct counts cannot be summed across the per-supermarket rows of
+        the materialized view, so they are counted from the small Category and
+        Supplier tables, probing the product foreign-key indexes with EXISTS
+        instead of aggregating every product.
+        """
+        return {
+            'categories_count': Category.objects.filter(created_by=user).filter(
+                Exists(products.filter(category=OuterRef('pk')))
+            ).count(),
+            'suppliers_count': Supplier.objects.filter(created_by=user).filter(
+                Exists(products.filter(supplier=OuterRef('pk')))
+            ).count(),
+        }
+    
+    def compute_stats(self, products, user):
+        """Compute statistics directly from the product table in a single query"""
+        today = timezone.now().date()
+        stats = products.aggregate(
+            **self.relation_counts(user),
+            total_products=Count('id'),
+            total_value=Sum(F('quantity') * F('price')),
+            low_stock_count=Count('id', filter=Q(quantity__lte=F('min_stock_level'))),
+            expired_count=Count('id', filter=Q(expiry_date__lt=today)),
+            expiring_soon_count=Count('id', filter=Q(
+                expiry_date__lte=today + timedelta(days=7),
+                expiry_date__gt=today
+            )),
+            out_of_stock_count=Count('id', filter=Q(quantity=0)),
+            # Average over products sold above a non-zero cost price
+            average_profit_margin=Avg(Case(
+                When(
+                    cost_price__gt=0,
+                    selling_price__gt=F('cost_price'),
+                    then=(F('selling_price') - F('cost_price')) * 100.0 / F('cost_price')
+                ),
+                output_field=FloatField()
+            )),
+        )
+        stats['total_value'] = stats['total_value'] or 0
+        stats['average_profit_margin'] = round(stats['average_profit_margin'] or 0, 2)
+        return stats
 
 
 class StockMovementListView(generics.ListAPIView):
@@ -364,13 +536,32 @@ class StockMovementListView(generics.ListAPIView):
     
     serializer_class = StockMovementSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = MovementCursorPagination
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['movement_type', 'product']
     ordering_fields = ['created_at']
     ordering = ['-created_at']
+    movement_fields = [
+        'id', 'product', 'movement_type', 'quantity', 'previous_quantity', 'new_quantity',
+        'unit_cost', 'total_cost', 'reference', 'notes', 'created_by', 'created_at',
+    ]
     
     def get_queryset(self):
         user = self.request.user
+        # Of the joined product and user rows only the names are rendered
+        return StockMovement.objects.filter(
+            product__supermarket__owner=user
+        ).select_related('product', 'created_by').only(
+            *self.movement_fields,
+            'product__name', 'created_by__first_name', 'created_by__last_name'
+        )
+
+
+def _clearance_prefetches():
+    """Prefetch the bundle items (and their products) rendered by ClearanceSerializer"""
+    return [
+        Prefetch('bundle_items', queryset=ClearanceBundleItem.objects.select_related('product')),
+    ]
 
 
 class ClearanceListCreateView(generics.ListCreateAPIView):
@@ -384,7 +575,9 @@ class ClearanceListCreateView(generics.ListCreateAPIView):
 
     def get_queryset(self):
         user = self.request.user
-        return Clearance.objects.filter(product__supermarket__owner=user).select_related('product')
+        return Clearance.objects.filter(
+            product__supermarket__owner=user
+        ).select_related('product').prefetch_related(*_clearance_prefetches())
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
@@ -396,7 +589,9 @@ class ClearanceDetailView(generics.RetrieveUpdateDestroyAPIView):
 
     def get_queryset(self):
         user = self.request.user
-        return Clearance.objects.filter(product__supermarket__owner=user)
+        return Clearance.objects.filter(
+            product__supermarket__owner=user
+        ).select_related('product').prefetch_related(*_clearance_prefetches())
 
 
 class ClearanceActiveListView(generics.ListAPIView):
@@ -406,8 +601,9 @@ class ClearanceActiveListView(generics.ListAPIView):
 
     def get_queryset(self):
         user = self.request.user
-        qs = Clearance.objects.filter(product__supermarket__owner=user)
-        return [c for c in qs if c.is_active]
+        return Clearance.objects.filter(
+            product__supermarket__owner=user
+        ).active().select_related('product').prefetch_related(*_clearance_prefetches())
 
 
 class ClearanceBarcodeView(APIView):
@@ -450,17 +646,14 @@ class ClearanceTicketView(APIView):
         try:
             # Temporarily swap barcode for generation
             setattr(product, 'barcode', clearance.generated_barcode or original_barcode)
-            pdf_bytes = TicketService.generate_product_ticket(product, include_qr=False)
+            pdf_buffer = TicketService.generate_product_ticket(product, include_qr=False)
             # Restore
             setattr(product, 'barcode', original_barcode)
-            return HttpResponse(pdf_bytes, content_type='application/pdf')
+            return FileResponse(pdf_buffer, content_type='application/pdf')
         except Exception as e:
             # Restore and return error
             setattr(product, 'barcode', original_barcode)
             return Response({'error': str(e)}, status=500)
-        return StockMovement.objects.filter(
-            product__supermarket__owner=user
-        ).select_related('product', 'created_by')
 
 
 class ProductAlertListView(generics.ListAPIView):
@@ -468,6 +661,7 @@ class ProductAlertListView(generics.ListAPIView):
     
     serializer_class = ProductAlertSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = AlertCursorPagination
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['alert_type', 'priority', 'is_read', 'is_resolved']
     ordering_fields = ['created_at', 'priority']
@@ -484,42 +678,74 @@ class ProductAlertListView(generics.ListAPIView):
 @permission_classes([permissions.IsAuthenticated])
 def mark_alert_as_read(request, alert_id):
     """Mark alert as read"""
-    try:
-        alert = ProductAlert.objects.get(
-            id=alert_id,
-            product__supermarket__owner=request.user
-        )
-        alert.is_read = True
-        alert.save()
-        
-        return Response({'message': 'Alert marked as read'})
-    except ProductAlert.DoesNotExist:
+    updated_count = ProductAlert.objects.filter(
+        id=alert_id,
+        product__supermarket__owner=request.user
+    ).update(is_read=True)
+    
+    if not updated_count:
         return Response(
             {'error': 'Alert not found'},
             status=status.HTTP_404_NOT_FOUND
         )
+    
+    return Response({'message': 'Alert marked as read'})
 
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def resolve_alert(request, alert_id):
     """Resolve alert"""
-    try:
-        alert = ProductAlert.objects.get(
-            id=alert_id,
-            product__supermarket__owner=request.user
-        )
-        alert.is_resolved = True
-        alert.resolved_at = timezone.now()
-        alert.resolved_by = request.user
-        alert.save()
-        
-        return Response({'message': 'Alert resolved'})
-    except ProductAlert.DoesNotExist:
+    updated_count = ProductAlert.objects.filter(
+        id=alert_id,
+        product__supermarket__owner=request.user
+    ).update(is_resolved=True, resolved_at=timezone.now(), resolved_by=request.user)
+    
+    if not updated_count:
         return Response(
             {'error': 'Alert not found'},
             status=status.HTTP_404_NOT_FOUND
         )
+    
+    return Response({'message': 'Alert resolved'})
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def bulk_mark_alerts_as_read(request):
+    """Mark several alerts as read with a single UPDATE"""
+    serializer = BulkAlertActionSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    updated_count = ProductAlert.objects.filter(
+        id__in=serializer.validated_data['alert_ids'],
+        product__supermarket__owner=request.user
+    ).update(is_read=True)
+    
+    return Response({
+        'message': f'{updated_count} alerts marked as read',
+        'updated_count': updated_count
+    })
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def bulk_resolve_alerts(request):
+    """Resolve several alerts with a single UPDATE"""
+    serializer = BulkAlertActionSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    updated_count = ProductAlert.objects.filter(
+        id__in=serializer.validated_data['alert_ids'],
+        product__supermarket__owner=request.user
+    ).update(is_resolved=True, resolved_at=timezone.now(), resolved_by=request.user)
+    
+    return Response({
+        'message': f'{updated_count} alerts resolved',
+        'updated_count': updated_count
+    })
 
 
 class ProductReviewListCreateView(generics.ListCreateAPIView):
@@ -543,14 +769,22 @@ class ProductReviewListCreateView(generics.ListCreateAPIView):
 @permission_classes([permissions.IsAuthenticated])
 def search_products_by_barcode(request, barcode):
     """Search products by barcode"""
-    try:
-        product = Product.objects.get(
+    def lookup():
+        product = Product.objects.select_related(
+            'category', 'supplier', 'supermarket', 'created_by'
+        ).prefetch_related(*_product_detail_prefetches()).with_valuation().get(
             barcode=barcode,
             supermarket__owner=request.user,
             is_active=True
         )
-        serializer = ProductDetailSerializer(product)
-        return Response(serializer.data)
+        return ProductDetailSerializer(product).data
+    
+    try:
+        # Cache-aside: invalidated by the signals in inventory/signals.py
+        data = owner_cached(
+            'product_barcode', request.user.id, (barcode,), lookup, BARCODE_LOOKUP_CACHE_TIMEOUT
+        )
+        return Response(data)
     except Product.DoesNotExist:
         return Response(
             {'error': 'Product not found'},
@@ -558,6 +792,31 @@ def search_products_by_barcode(request, barcode):
         )
 
 
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def search_products_by_barcodes(request):
+    """Search products for a batch of scanned barcodes with a single query"""
+    serializer = BulkBarcodeSearchSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    barcodes = list(dict.fromkeys(serializer.validated_data['barcodes']))
+    products = Product.objects.select_related(
+        'category', 'supplier', 'supermarket', 'created_by'
+    ).prefetch_related(*_product_detail_prefetches()).with_valuation().filter(
+        supermarket__owner=request.user,
+        is_active=True
+    ).in_bulk(barcodes, field_name='barcode')
+    
+    return Response({
+        'products': {
+            barcode: ProductDetailSerializer(product).data
+            for barcode, product in products.items()
+        },
+        'not_found': [barcode for barcode in barcodes if barcode not in products]
+    })
+
+
 class BarcodeGenerationView(APIView):
     """Generate barcode for a product"""
     
@@ -644,11 +903,19 @@ class ProductTicketView(APIView):
             
             include_qr = request.GET.get('include_qr', 'true').lower() == 'true'
             
-            # Generate ticket PDF
-            ticket_pdf = TicketService.generate_product_ticket(product, include_qr)
+            # Cache-aside: labels are reprinted often, and the signals in
+            # inventory/signals.py invalidate the entry when the product changes
+            ticket_pdf = owner_cached(
+                'product_ticket', request.user.id, (product.id, include_qr),
+                lambda: TicketService.generate_product_ticket(product, include_qr).getvalue(),
+                PRODUCT_TICKET_CACHE_TIMEOUT
+            )
             
+            # Respond with the bytes directly rather than re-wrapping them in a buffer
             response = HttpResponse(ticket_pdf, content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="{product.name}_ticket.pdf"'
+            response['Content-Disposition'] = content_disposition_header(
+                True, f'{product.name}_ticket.pdf'
+            )
             return response
             
         except Product.DoesNotExist:
@@ -680,28 +947,29 @@ class BulkTicketsView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            # Get products
-            products = Product.objects.filter(
+            # Get the printed fields as plain rows rather than Product instances
+            rows = list(Product.objects.filter(
                 id__in=product_ids,
                 supermarket__owner=request.user,
                 is_active=True
-            )
+            ).values(*TicketService.BULK_TICKET_FIELDS))
             
-            if not products.exists():
+            if not rows:
                 return Response(
                     {'error': 'No products found'},
                     status=status.HTTP_404_NOT_FOUND
                 )
             
             # Generate bulk tickets PDF
-            tickets_pdf = TicketService.generate_bulk_tickets(
-                list(products), 
+            tickets_pdf = TicketService.generate_bulk_tickets_from_values(
+                rows, 
                 tickets_per_page
             )
             
-            response = HttpResponse(tickets_pdf, content_type='application/pdf')
-            response['Content-Disposition'] = 'attachment; filename="product_tickets.pdf"'
-            return response
+            return FileResponse(
+                tickets_pdf, content_type='application/pdf',
+                as_attachment=True, filename='product_tickets.pdf'
+            )
             
         except Exception as e:
             return Response(
@@ -714,6 +982,8 @@ class BulkBarcodesView(APIView):
     """Generate bulk barcodes sheet"""
     
     permission_classes = [permissions.IsAuthenticated]
+    # Upper bound on one sheet; the whole PDF is laid out in memory
+    MAX_PRODUCTS = 1000
     
     def post(self, request):
         """Generate barcode sheet for multiple products"""
@@ -734,21 +1004,32 @@ class BulkBarcodesView(APIView):
                     is_active=True
                 )
             
-            if not products.exists():
+            # Get the printed fields as plain rows rather than Product instances; one
+            # row past the cap tells an oversized request apart without a COUNT
+            rows = list(products.values(*TicketService.BARCODE_SHEET_FIELDS)[:self.MAX_PRODUCTS + 1])
+            
+            if not rows:
                 return Response(
                     {'error': 'No products found'},
                     status=status.HTTP_404_NOT_FOUND
                 )
             
+            if len(rows) > self.MAX_PRODUCTS:
+                return Response(
+                    {'error': f'Too many products for one barcode sheet (max {self.MAX_PRODUCTS}), pass product_ids'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
             # Generate barcode sheet PDF
-            barcode_pdf = TicketService.generate_barcode_sheet(
-                list(products), 
+            barcode_pdf = TicketService.generate_barcode_sheet_from_values(
+                rows, 
                 barcodes_per_page
             )
             
-            response = HttpResponse(barcode_pdf, content_type='application/pdf')
-            response['Content-Disposition'] = 'attachment; filename="product_barcodes.pdf"'
-            return response
+            return FileResponse(
+                barcode_pdf, content_type='application/pdf',
+                as_attachment=True, filename='product_barcodes.pdf'
+            )
             
         except Exception as e:
             return Response(
@@ -762,7 +1043,9 @@ class BulkBarcodesView(APIView):
 def generate_barcode_for_product(request, product_id):
     """Generate a new barcode for an existing product"""
     try:
-        product = Product.objects.get(
+        product = Product.objects.select_related(
+            'category', 'supplier', 'supermarket', 'supermarket__parent'
+        ).with_stock_status().get(
             id=product_id,
             supermarket__owner=request.user
         )
@@ -124,7 +124,7 @@ def test_ticket_generation():
     print("1. Testing single ticket generation...")
     try:
         ticket_pdf = TicketService.generate_product_ticket(product, include_qr=True)
-        print(f"   Generated ticket PDF: {len(ticket_pdf)} bytes")
+        print(f"   Generated ticket PDF: {ticket_pdf.getbuffer().nbytes} bytes")
     except Exception as e:
         print(f"   Error generating ticket: {e}")
     
@@ -133,7 +133,7 @@ def test_ticket_generation():
     try:
         products = [product]  # In real scenario, this would be multiple products
         bulk_pdf = TicketService.generate_bulk_tickets(products, tickets_per_page=8)
-        print(f"   Generated bulk tickets PDF: {len(bulk_pdf)} bytes")
+        print(f"   Generated bulk tickets PDF: {bulk_pdf.getbuffer().nbytes} bytes")
     except Exception as e:
         print(f"   Error generating bulk tickets: {e}")
     
@@ -141,7 +141,7 @@ def test_ticket_generation():
     print("3. Testing barcode sheet generation...")
     try:
         barcode_sheet = TicketService.generate_barcode_sheet(products, barcodes_per_page=20)
-        print(f"   Generated barcode sheet PDF: {len(barcode_sheet)} bytes")
+        print(f"   Generated barcode sheet PDF: {barcode_sheet.getbuffer().nbytes} bytes")
     except Exception as e:
         print(f"   Error generating barcode sheet: {e}")
 